@@ -0,0 +1,78 @@
+"""
+Eight Cards Poker - Compiled best-hand search
+Numba kernels over the hand_eval tables; AVAILABLE is False without numba/numpy
+"""
+
+from hand_eval import COMBOS_7C5, COMBOS_4C2, COMBOS_5C3
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+AVAILABLE = njit is not None
+
+if AVAILABLE:
+    from hand_eval import NP_FLUSHES as _FLUSHES, NP_UNIQUE5 as _UNIQUE5
+    # The prime products are too sparse for a flat table, so the kernels
+    # binary search the sorted key array instead
+    from hand_eval import NP_PRODUCT_KEYS as _PRODUCT_KEYS, NP_PRODUCT_VALS as _PRODUCT_VALS
+    _COMBOS_7C5 = np.array(COMBOS_7C5, dtype=np.int64)
+    _COMBOS_4C2 = np.array(COMBOS_4C2, dtype=np.int64)
+    _COMBOS_5C3 = np.array(COMBOS_5C3, dtype=np.int64)
+
+    @njit(cache=True)
+    def _eval5(c1, c2, c3, c4, c5, flushes, unique5, keys, vals):
+        q = (c1 | c2 | c3 | c4 | c5) >> 16
+        if c1 & c2 & c3 & c4 & c5 & 0xF000:
+            return flushes[q]
+        strength = unique5[q]
+        if strength:
+            return strength
+        product = (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)
+        return vals[np.searchsorted(keys, product)]
+
+    @njit(cache=True)
+    def _best_of_seven(c, combos, flushes, unique5, keys, vals):
+        best = 7463
+        best_idx = 0
+        for i in range(combos.shape[0]):
+            strength = _eval5(c[combos[i, 0]], c[combos[i, 1]], c[combos[i, 2]],
+                              c[combos[i, 3]], c[combos[i, 4]], flushes, unique5, keys, vals)
+            if strength < best:
+                best = strength
+                best_idx = i
+        return best, best_idx
+
+    @njit(cache=True)
+    def _best_plo(h, b, hole_combos, board_combos, flushes, unique5, keys, vals):
+        best = 7463
+        best_h = 0
+        best_b = 0
+        for i in range(hole_combos.shape[0]):
+            h0 = h[hole_combos[i, 0]]
+            h1 = h[hole_combos[i, 1]]
+            for j in range(board_combos.shape[0]):
+                strength = _eval5(h0, h1, b[board_combos[j, 0]], b[board_combos[j, 1]],
+                                  b[board_combos[j, 2]], flushes, unique5, keys, vals)
+                if strength < best:
+                    best = strength
+                    best_h = i
+                    best_b = j
+        return best, best_h, best_b
+
+def eval7(codes):
+    """Best 5 of exactly 7 card codes: (strength, index tuple into codes)"""
+    strength, i = _best_of_seven(np.asarray(codes, dtype=np.int64), _COMBOS_7C5,
+                                 _FLUSHES, _UNIQUE5, _PRODUCT_KEYS, _PRODUCT_VALS)
+    return int(strength), COMBOS_7C5[i]
+
+def eval_plo(hole_codes, board_codes):
+    """Best 2 of 4 hole plus 3 of 5 board codes: (strength, hole indexes, board indexes)"""
+    strength, i, j = _best_plo(np.asarray(hole_codes, dtype=np.int64),
+                               np.asarray(board_codes, dtype=np.int64),
+                               _COMBOS_4C2, _COMBOS_5C3,
+                               _FLUSHES, _UNIQUE5, _PRODUCT_KEYS, _PRODUCT_VALS)
+    return int(strength), COMBOS_4C2[i], COMBOS_5C3[j]
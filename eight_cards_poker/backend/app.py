@@ -3,376 +3,51 @@ Eight Cards Poker - Multiplayer Server
 Flask + Socket.IO backend for real-time multiplayer
 """
 
-from flask import Flask, request, jsonify, send_from_directory
-from flask_socketio import SocketIO, emit, join_room, leave_room
+# Prefer eventlet: one cooperative event loop serves every socket instead of an
+# OS thread per connection. It must patch the stdlib before anything else loads.
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    async_mode = 'eventlet'
+except ImportError:
+    async_mode = 'threading'
+
+from flask import Flask
+from flask_socketio import SocketIO
 from flask_cors import CORS
+import logging
 import os
-import random
-import string
-from typing import Dict
-from game_engine import GameEngine, GamePhase, BoardType
+import fast_json
+import handlers
 
+# Log level comes from the environment (e.g. LOG_LEVEL=DEBUG for per-event tracing)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), '..', 'frontend', 'app', 'dist'))
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 CORS(app, origins="*")
-# Use threading mode for compatibility with Python 3.12+ and add robust ping settings
+# Fall back to threading mode when eventlet is unavailable and add robust ping settings
 socketio = SocketIO(
     app,
     cors_allowed_origins="*",
-    async_mode='threading',
+    async_mode=async_mode,
     ping_timeout=60,
     ping_interval=25,
     logger=False,
-    engineio_logger=False
+    engineio_logger=False,
+    json=fast_json,
+    # With REDIS_URL set, emits fan out through Redis to every worker. Only
+    # emits are shared: rooms and sessions live in the worker that created
+    # them, so the load balancer must pin each client and both players of a
+    # room to the same worker (sticky sessions), or joins find no room
+    message_queue=os.environ.get('REDIS_URL')
 )
+if os.environ.get('REDIS_URL'):
+    logging.getLogger(__name__).warning(
+        'REDIS_URL set: emits go through Redis, but rooms are local to this '
+        'worker; run several workers only behind sticky sessions that keep '
+        'both players of a room on the same worker')
 
-# Store active game rooms
-game_rooms: Dict[str, GameEngine] = {}
-# Map session IDs to room and player info
-sessions: Dict[str, Dict] = {}
-
-def generate_room_id() -> str:
-    """Generate a random 6-character room ID"""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-
-@app.after_request
-def add_no_cache_headers(response):
-    # Avoid stale caches causing dev/prod layout differences
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    # Force CSS/JS reload
-    if response.content_type and ('css' in response.content_type or 'javascript' in response.content_type):
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    return response
-
-@app.route('/')
-def index():
-    """Serve the game client (built React app in prod)"""
-    dist_path = app.static_folder
-    index_path = os.path.join(dist_path, 'index.html')
-    if os.path.exists(index_path):
-        return send_from_directory(dist_path, 'index.html')
-    # fallback to legacy static
-    legacy_frontend = os.path.join(os.path.dirname(__file__), '..', 'frontend')
-    return send_from_directory(legacy_frontend, 'index.html')
-
-@app.route('/assets/<path:path>')
-def serve_assets(path):
-    """Serve built assets from Vite prod build"""
-    dist_assets = os.path.join(app.static_folder, 'assets')
-    if os.path.exists(dist_assets):
-        return send_from_directory(dist_assets, path)
-    # fallback (old static path if needed)
-    legacy_static = os.path.join(os.path.dirname(__file__), '..', 'frontend', 'static')
-    return send_from_directory(legacy_static, path)
-
-@app.route('/health')
-def health_check():
-    """Health check endpoint for deployment"""
-    return jsonify({'status': 'healthy', 'rooms': len(game_rooms)})
-
-# Socket.IO Events
-
-@socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
-    print(f'Client connected: {request.sid}')
-    emit('connected', {'session_id': request.sid})
-
-@socketio.on('disconnect')
-def handle_disconnect():
-    """Handle client disconnection"""
-    print(f'Client disconnected: {request.sid}')
-    
-    # Leave any active game
-    if request.sid in sessions:
-        session = sessions[request.sid]
-        room_id = session['room_id']
-        player_id = session['player_id']
-        
-        leave_room(room_id)
-        
-        # Notify other players
-        emit('player_left', {
-            'player_id': player_id
-        }, room=room_id, skip_sid=request.sid)
-        
-        # Clean up if room is empty
-        if room_id in game_rooms:
-            game = game_rooms[room_id]
-            game.remove_player(request.sid)
-            if len(game.players) == 0:
-                del game_rooms[room_id]
-                print(f'Room {room_id} closed')
-        
-        del sessions[request.sid]
-
-@socketio.on('create_room')
-def handle_create_room(data):
-    """Create a new game room"""
-    player_name = data.get('player_name', 'Player 1')
-    room_id = generate_room_id()
-    
-    # Create new game
-    game = GameEngine(room_id)
-    player_id = game.add_player(request.sid, player_name)
-    
-    if player_id:
-        game_rooms[room_id] = game
-        sessions[request.sid] = {
-            'room_id': room_id,
-            'player_id': player_id,
-            'player_name': player_name
-        }
-        
-        join_room(room_id)
-        
-        emit('room_created', {
-            'room_id': room_id,
-            'player_id': player_id,
-            'player_name': player_name
-        })
-        
-        # Send initial game state
-        emit('game_state', game.get_game_state(player_id))
-        
-        print(f'Room {room_id} created by {player_name}')
-    else:
-        emit('error', {'message': 'Failed to create room'})
-
-@socketio.on('join_room')
-def handle_join_room(data):
-    """Join an existing game room"""
-    room_id = data.get('room_id', '').upper()
-    player_name = data.get('player_name', 'Player 2')
-    
-    if room_id not in game_rooms:
-        emit('error', {'message': 'Room not found'})
-        return
-    
-    game = game_rooms[room_id]
-    player_id = game.add_player(request.sid, player_name)
-    
-    if player_id:
-        sessions[request.sid] = {
-            'room_id': room_id,
-            'player_id': player_id,
-            'player_name': player_name
-        }
-        
-        join_room(room_id)
-        
-        emit('room_joined', {
-            'room_id': room_id,
-            'player_id': player_id,
-            'player_name': player_name
-        })
-        
-        # Notify all players in room
-        emit('player_joined', {
-            'player_id': player_id,
-            'player_name': player_name
-        }, room=room_id)
-        
-        # Send game state to all players
-        for sid, session in sessions.items():
-            if session['room_id'] == room_id:
-                socketio.emit('game_state', 
-                            game.get_game_state(session['player_id']),
-                            room=sid)
-        
-        print(f'{player_name} joined room {room_id}')
-        
-        # Auto-start betting if both players present
-        if len(game.players) == 2:
-            emit('ready_to_bet', {}, room=room_id)
-    else:
-        emit('error', {'message': 'Room is full'})
-
-@socketio.on('place_bet')
-def handle_place_bet(data):
-    """Handle bet placement with matching-bet enforcement"""
-    if request.sid not in sessions:
-        emit('error', {'message': 'Not in a game'})
-        return
-
-    session = sessions[request.sid]
-    room_id = session['room_id']
-    player_id = session['player_id']
-    bet_amount = data.get('amount', 50)
-
-    if room_id not in game_rooms:
-        emit('error', {'message': 'Game not found'})
-        return
-
-    game = game_rooms[room_id]
-
-    # Store bet intent
-    if not hasattr(game, 'pending_bets'):
-        game.pending_bets = {}
-
-    game.pending_bets[player_id] = bet_amount
-
-    # Always inform room about the bet
-    emit('bet_placed', {
-        'player_id': player_id,
-        'amount': bet_amount
-    }, room=room_id)
-
-    # Proceed only when both players have bet
-    if len(game.pending_bets) == 2:
-        bets = list(game.pending_bets.values())
-        if bets[0] != bets[1]:
-            # Require matching bets for simplicity
-            emit('error', {
-                'message': f'Bets must match! One player bet ${bets[0]}, the other ${bets[1]}. Both need to bet the same amount.'
-            }, room=room_id)
-
-            # Clear the lower bet so both can rebid to the higher
-            max_bet = max(bets)
-            for pid in list(game.pending_bets.keys()):
-                if game.pending_bets[pid] < max_bet:
-                    del game.pending_bets[pid]
-            return
-
-        # Bets match → place and start game
-        if game.place_bets(game.pending_bets):
-            game.start_game()
-            game.pending_bets = {}
-
-            # Send updated game state to all players
-            for sid, sess in sessions.items():
-                if sess['room_id'] == room_id:
-                    socketio.emit('game_started',
-                                   game.get_game_state(sess['player_id']),
-                                   room=sid)
-            print(f'Game started in room {room_id}')
-        else:
-            emit('error', {'message': 'Invalid bet amount'}, room=room_id)
-
-@socketio.on('move_card')
-def handle_move_card(data):
-    """Handle card movement"""
-    if request.sid not in sessions:
-        emit('error', {'message': 'Not in a game'})
-        return
-    
-    session = sessions[request.sid]
-    room_id = session['room_id']
-    player_id = session['player_id']
-    
-    if room_id not in game_rooms:
-        emit('error', {'message': 'Game not found'})
-        return
-    
-    game = game_rooms[room_id]
-    
-    card_id = data.get('card_id')
-    from_location = data.get('from')
-    to_location = data.get('to')
-    
-    if game.move_card(player_id, card_id, from_location, to_location):
-        # Send updated state to both players
-        for sid, sess in sessions.items():
-            if sess['room_id'] == room_id:
-                socketio.emit('game_state', 
-                            game.get_game_state(sess['player_id']),
-                            room=sid)
-    else:
-        emit('error', {'message': 'Invalid move'})
-
-@socketio.on('confirm_placement')
-def handle_confirm_placement(data):
-    """Handle placement confirmation"""
-    if request.sid not in sessions:
-        emit('error', {'message': 'Not in a game'})
-        return
-    
-    session = sessions[request.sid]
-    room_id = session['room_id']
-    player_id = session['player_id']
-    
-    if room_id not in game_rooms:
-        emit('error', {'message': 'Game not found'})
-        return
-    
-    game = game_rooms[room_id]
-    
-    if game.confirm_placement(player_id):
-        # Send updated state
-        for sid, sess in sessions.items():
-            if sess['room_id'] == room_id:
-                socketio.emit('game_state', 
-                            game.get_game_state(sess['player_id']),
-                            room=sid)
-        
-        # Check if ready for showdown
-        if game.phase == GamePhase.SHOWDOWN:
-            results = game.calculate_showdown()
-            emit('showdown_results', results, room=room_id)
-    else:
-        emit('error', {'message': 'Invalid placement'})
-
-@socketio.on('request_rematch')
-def handle_rematch(data):
-    """Handle rematch request and fully reset boards"""
-    if request.sid not in sessions:
-        return
-
-    session = sessions[request.sid]
-    room_id = session['room_id']
-    player_id = session['player_id']
-
-    if room_id not in game_rooms:
-        return
-
-    game = game_rooms[room_id]
-
-    # Track rematch requests
-    if not hasattr(game, 'rematch_requests'):
-        game.rematch_requests = set()
-
-    game.rematch_requests.add(player_id)
-
-    if len(game.rematch_requests) == 2:
-        # Both want rematch - reset for new game
-        game.rematch_requests = set()
-        game.phase = GamePhase.WAITING
-
-        # Reset player bets and ready status
-        for player in game.players.values():
-            player.bet = 0
-            player.ready = False
-            player.hand = []
-
-        # Clear boards completely
-        for board in game.boards.values():
-            board.community = []
-            board.p1_cards = []
-            board.p2_cards = []
-            board.type = BoardType.PENDING
-
-        emit('ready_to_bet', {}, room=room_id)
-    else:
-        emit('rematch_requested', {'player_id': player_id}, room=room_id)
-
-@socketio.on('send_message')
-def handle_message(data):
-    """Handle chat messages"""
-    if request.sid not in sessions:
-        return
-    
-    session = sessions[request.sid]
-    room_id = session['room_id']
-    player_name = session['player_name']
-    message = data.get('message', '')
-    
-    if message and len(message) < 200:  # Limit message length
-        emit('chat_message', {
-            'player_name': player_name,
-            'message': message
-        }, room=room_id)
+handlers.register(app, socketio)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -380,7 +55,7 @@ if __name__ == '__main__':
     print(f"""
     ===================================
     Eight Cards Poker - Multiplayer Server
-    Starting on port {port}
+    Starting on port {port} ({async_mode} mode)
     
     To play locally:
     1. Run this server
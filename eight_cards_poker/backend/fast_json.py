@@ -0,0 +1,22 @@
+"""
+Eight Cards Poker - JSON codec for Socket.IO
+Uses orjson when it is installed, otherwise falls back to the stdlib json module
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj, **kwargs):
+        """Serialize to a str; orjson output is always compact so separators are ignored"""
+        # Player IDs are int keys, serialize them as strings like the stdlib does
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    loads = orjson.loads
+else:
+    dumps = json.dumps
+    loads = json.loads
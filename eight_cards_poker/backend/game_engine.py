@@ -4,9 +4,13 @@ Core game logic separated from I/O
 """
 
 import random
+import threading
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 from enum import Enum
+from hand_eval import (RANKS, SUITS, CARD_CODES, WORST_HAND, eval5, hand_class, hand_name,
+                       index_combos, COMBOS_7C5, COMBOS_4C2, COMBOS_5C3)
+import _eval_numba
 
 class GamePhase(Enum):
     WAITING = "waiting"
@@ -23,33 +27,93 @@ class BoardType(Enum):
     P2_PLO = "p2_plo"  # Player 2's PLO board
     BOTH_PLO = "both_plo"  # Both players chose same PLO board
 
-RANKS = "23456789TJQKA"
-SUITS = "cdhs"
-
-@dataclass
+# Board types on which each player plays PLO rules
+_P1_PLO_TYPES = frozenset({BoardType.P1_PLO, BoardType.BOTH_PLO})
+_P2_PLO_TYPES = frozenset({BoardType.P2_PLO, BoardType.BOTH_PLO})
+# Board types that are PLO for only one of the players
+_SINGLE_PLO_TYPES = frozenset({BoardType.P1_PLO, BoardType.P2_PLO})
+# Board type by (is player 1's PLO board, is player 2's PLO board)
+_PLO_CHOICE_TYPES = {
+    (False, False): BoardType.NLHE,
+    (True, False): BoardType.P1_PLO,
+    (False, True): BoardType.P2_PLO,
+    (True, True): BoardType.BOTH_PLO
+}
+# What the public state shows in each phase: (board cards face up, hands hidden)
+_PHASE_VIEWS = {
+    GamePhase.WAITING: (False, True),
+    GamePhase.BETTING: (False, True),
+    GamePhase.PLACING: (False, True),
+    GamePhase.SHOWDOWN: (True, True),
+    GamePhase.COMPLETE: (True, False)
+}
+
+def display_type(board_type: BoardType, player_id: Optional[int]) -> str:
+    """Simplify board type for frontend display from a player's perspective"""
+    if board_type == BoardType.BOTH_PLO:
+        return 'plo'
+    if board_type in _SINGLE_PLO_TYPES:
+        # Show as PLO/NL based on player perspective
+        if player_id == 1 and board_type == BoardType.P1_PLO:
+            return 'plo'
+        if player_id == 2 and board_type == BoardType.P2_PLO:
+            return 'plo'
+        return 'nlhe'
+    return board_type.value
+
+# eq=False: cards are unique objects, so membership tests compare identity
+# instead of every field. Frozen, so derived values can be computed once.
+@dataclass(eq=False, frozen=True, slots=True)
 class Card:
     rank: str
     suit: str
     id: int
-
-    def to_dict(self):
-        return {
+    # Integer encoding for the hand evaluator, derived from rank and suit
+    code: int = field(init=False, repr=False)
+    # Serialized form, shared by every state payload (treat as read-only)
+    _dict: Dict = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'code', CARD_CODES[self.rank + self.suit])
+        object.__setattr__(self, '_dict', {
             'rank': self.rank,
             'suit': self.suit,
             'id': self.id
-        }
+        })
+
+    def to_dict(self):
+        return self._dict
 
     @classmethod
     def from_dict(cls, data):
         return cls(**data)
 
-@dataclass
+@dataclass(slots=True)
 class Board:
     id: str
     type: BoardType = BoardType.PENDING
     community: List[Card] = field(default_factory=list)
     p1_cards: List[Card] = field(default_factory=list)
     p2_cards: List[Card] = field(default_factory=list)
+    # IDs of the cards in p1_cards/p2_cards for O(1) membership tests
+    p1_ids: Set[int] = field(default_factory=set)
+    p2_ids: Set[int] = field(default_factory=set)
+    # len(p1_cards)/len(p2_cards), kept in step by the methods below; bumping
+    # them also goes through __setattr__ and drops the cached views
+    p1_count: int = 0
+    p2_count: int = 0
+    # Serialized views, dropped whenever the board changes
+    _cache: Optional[Dict] = field(default=None, init=False, repr=False)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != '_cache':
+            object.__setattr__(self, '_cache', None)
+
+    def _views(self) -> Dict:
+        if self._cache is None:
+            object.__setattr__(self, '_cache', {})
+        return self._cache
 
     def to_dict(self):
         return {
@@ -60,49 +124,179 @@ class Board:
             'p2_cards': [c.to_dict() for c in self.p2_cards]
         }
 
+    def public_view(self, reveal: bool) -> Dict:
+        """The board as every viewer sees it; player cards are backs unless revealed"""
+        views = self._views()
+        key = ('public', reveal)
+        view = views.get(key)
+        if view is None:
+            view = {
+                'type': display_type(self.type, None),
+                'actual_type': self.type.value,  # Keep actual type for debugging
+                'community': [c.to_dict() for c in self.community]
+            }
+            if reveal:
+                # Show all cards
+                view['p1_cards'] = [c.to_dict() for c in self.p1_cards]
+                view['p2_cards'] = [c.to_dict() for c in self.p2_cards]
+            else:
+                # Everyone sees card backs, owners get their cards via private state
+                view['p1_cards'] = [{'hidden': True}] * len(self.p1_cards)
+                view['p2_cards'] = [{'hidden': True}] * len(self.p2_cards)
+            views[key] = view
+        return view
+
+    def player_view(self, player: int) -> List[Dict]:
+        """The given player's own cards on this board"""
+        views = self._views()
+        key = ('cards', player)
+        view = views.get(key)
+        if view is None:
+            view = views[key] = [c.to_dict() for c in self.get_player_cards(player)]
+        return view
+
     def get_player_cards(self, player: int):
         return self.p1_cards if player == 1 else self.p2_cards
 
+    def get_player_ids(self, player: int) -> Set[int]:
+        return self.p1_ids if player == 1 else self.p2_ids
+
     def set_player_cards(self, player: int, cards: List[Card]):
         if player == 1:
             self.p1_cards = cards
+            self.p1_ids = {c.id for c in cards}
+            self.p1_count = len(cards)
         else:
             self.p2_cards = cards
+            self.p2_ids = {c.id for c in cards}
+            self.p2_count = len(cards)
+
+    def add_player_card(self, player: int, card: Card):
+        if player == 1:
+            self.p1_cards.append(card)
+            self.p1_ids.add(card.id)
+            self.p1_count += 1
+        else:
+            self.p2_cards.append(card)
+            self.p2_ids.add(card.id)
+            self.p2_count += 1
 
-@dataclass
+    def remove_player_card(self, player: int, card: Card):
+        if player == 1:
+            self.p1_ids.discard(card.id)
+            self.p1_cards.remove(card)
+            self.p1_count -= 1
+        else:
+            self.p2_ids.discard(card.id)
+            self.p2_cards.remove(card)
+            self.p2_count -= 1
+
+    def clear(self):
+        """Empty the board so the same object can be dealt again"""
+        self.type = BoardType.PENDING
+        self.community = []
+        self.set_player_cards(1, [])
+        self.set_player_cards(2, [])
+
+    def deal_community(self, cards: List[Card]):
+        self.community.extend(cards)
+        self._cache = None
+
+@dataclass(slots=True)
 class Player:
     id: int
     name: str
     bankroll: int = 1000
     bet: int = 0
     hand: List[Card] = field(default_factory=list)
+    # IDs of the cards in hand for O(1) membership tests
+    hand_ids: Set[int] = field(default_factory=set)
     session_id: Optional[str] = None
     ready: bool = False
+    # Serialized views, dropped whenever the player changes
+    _cache: Optional[Dict] = field(default=None, init=False, repr=False)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != '_cache':
+            object.__setattr__(self, '_cache', None)
 
     def to_dict(self, hide_hand=False):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'bankroll': self.bankroll,
-            'bet': self.bet,
-            'hand': [] if hide_hand else [c.to_dict() for c in self.hand],
-            'ready': self.ready
-        }
+        if self._cache is None:
+            object.__setattr__(self, '_cache', {})
+        view = self._cache.get(hide_hand)
+        if view is None:
+            view = self._cache[hide_hand] = {
+                'id': self.id,
+                'name': self.name,
+                'bankroll': self.bankroll,
+                'bet': self.bet,
+                'hand': [] if hide_hand else self.hand_view(),
+                'ready': self.ready
+            }
+        return view
+
+    def hand_view(self):
+        if self._cache is None:
+            object.__setattr__(self, '_cache', {})
+        view = self._cache.get('hand')
+        if view is None:
+            view = self._cache['hand'] = [c.to_dict() for c in self.hand]
+        return view
+
+    def add_card(self, card: Card):
+        self.hand.append(card)
+        self.hand_ids.add(card.id)
+        self._cache = None
+
+    def remove_card(self, card: Card):
+        self.hand_ids.discard(card.id)
+        self.hand.remove(card)
+        self._cache = None
+
+# Cards are immutable, so every game deals the same 52 objects in its own order
+_CANONICAL_DECK = tuple(Card(rank, suit, suit_idx * len(RANKS) + rank_idx)
+                        for suit_idx, suit in enumerate(SUITS)
+                        for rank_idx, rank in enumerate(RANKS))
+_CARDS_BY_ID: Dict[int, Card] = {card.id: card for card in _CANONICAL_DECK}
 
 class GameEngine:
+    __slots__ = ('room_id', 'players', 'boards', 'deck', 'phase', 'current_player',
+                 'pot', 'seed', 'pending_bets', 'rematch_requests', 'lock', '_card_index',
+                 '_deck_pos')
+
     def __init__(self, room_id: str):
-        self.room_id = room_id
+        # Per-room lock so unrelated games never contend with each other
+        self.lock = threading.RLock()
         self.players: Dict[int, Player] = {}
         self.boards: Dict[str, Board] = {
             'A': Board('A'),
             'B': Board('B'),
             'C': Board('C')
         }
+        self.pending_bets: Dict[int, int] = {}
+        self.rematch_requests: Set[int] = set()
+        self.reset(room_id)
+
+    def reset(self, room_id: str):
+        """Return the engine to a fresh state so it can host another room"""
+        self.room_id = room_id
+        # The containers and boards outlive the room, only their contents go
+        self.players.clear()
+        for board in self.boards.values():
+            board.clear()
         self.deck: List[Card] = []
+        # Next undealt card in deck; dealing advances it instead of slicing the list
+        self._deck_pos = 0
+        # Every card of the current deck by ID; cards move, their identity doesn't
+        self._card_index: Dict[int, Card] = {}
         self.phase = GamePhase.WAITING
         self.current_player = 1
         self.pot = 0
         self.seed = None
+        # Bet intents and rematch votes collected by the server, keyed by player ID
+        self.pending_bets.clear()
+        self.rematch_requests.clear()
 
     def add_player(self, session_id: str, name: str) -> Optional[int]:
         """Add a player to the game. Returns player ID (1 or 2) or None if full."""
@@ -145,99 +339,90 @@ class GameEngine:
             return False
 
         # Reset boards
-        self.boards = {
-            'A': Board('A'),
-            'B': Board('B'),
-            'C': Board('C')
-        }
+        for board in self.boards.values():
+            board.clear()
 
         # Create and shuffle deck
         self.seed = seed if seed else random.randint(0, 1000000)
         self.deck = self._create_deck()
         random.Random(self.seed).shuffle(self.deck)
+        self._deck_pos = 0
 
         # Deal cards
         for player in self.players.values():
-            player.hand = self.deck[:8]
-            self.deck = self.deck[8:]
+            player.hand = self._draw(8)
+            player.hand_ids = {c.id for c in player.hand}
             player.ready = False
 
         # Deal flops
         for board_id in ['A', 'B', 'C']:
-            self.boards[board_id].community = self.deck[:3]
-            self.deck = self.deck[3:]
+            self.boards[board_id].community = self._draw(3)
 
         self.phase = GamePhase.PLACING
         self.current_player = 1
         return True
 
+    def _draw(self, n: int) -> List[Card]:
+        """Deal the next n cards off the deck"""
+        start = self._deck_pos
+        self._deck_pos = start + n
+        return self.deck[start:start + n]
+
     def _create_deck(self) -> List[Card]:
         """Create a standard 52-card deck"""
-        deck = []
-        card_id = 0
-        for suit in SUITS:
-            for rank in RANKS:
-                deck.append(Card(rank, suit, card_id))
-                card_id += 1
-        return deck
-
-    def move_card(self, player_id: int, card_id: int, from_location: str, to_location: str) -> bool:
-        """Move a card from one location to another"""
+        self._card_index = _CARDS_BY_ID
+        return list(_CANONICAL_DECK)
+
+    def move_card(self, player_id: int, card_id: int, from_location: str, to_location: str) -> Optional[Dict]:
+        """Move a card from one location to another, returning the move or None if invalid"""
         if self.phase != GamePhase.PLACING:
-            return False
+            return None
         if player_id != self.current_player:
-            return False
+            return None
 
         # Find the card
         card = self._find_card_by_id(card_id)
         if not card:
-            return False
+            return None
 
         # Remove from source
         if not self._remove_card_from_location(card, from_location, player_id):
-            return False
+            return None
 
         # Add to destination
         if not self._add_card_to_location(card, to_location, player_id):
             # Rollback
             self._add_card_to_location(card, from_location, player_id)
-            return False
+            return None
 
         # Auto-determine board types
         self._determine_board_types()
-        return True
+        return {
+            'player_id': player_id,
+            'card_id': card_id,
+            'from': from_location,
+            'to': to_location
+        }
 
     def _find_card_by_id(self, card_id: int) -> Optional[Card]:
         """Find a card by its ID"""
-        # Check hands
-        for player in self.players.values():
-            for card in player.hand:
-                if card.id == card_id:
-                    return card
-
-        # Check boards
-        for board in self.boards.values():
-            for card in board.p1_cards + board.p2_cards:
-                if card.id == card_id:
-                    return card
-
-        return None
+        # The index also holds community and undealt cards; removing them from
+        # a player location fails, so those moves are still rejected
+        return self._card_index.get(card_id)
 
     def _remove_card_from_location(self, card: Card, location: str, player_id: int) -> bool:
         """Remove card from specified location"""
         if location.startswith('hand'):
             player = self.players.get(player_id)
-            if player and card in player.hand:
-                player.hand.remove(card)
+            if player and card.id in player.hand_ids:
+                player.remove_card(card)
                 return True
         elif location.startswith('board'):
             board_id = location.split('-')[1]
             board = self.boards.get(board_id)
             if board:
-                player_cards = board.get_player_cards(player_id)
-                if card in player_cards:
-                    player_cards.remove(card)
-                    board.set_player_cards(player_id, player_cards)
+                if card.id in board.get_player_ids(player_id):
+                    board.remove_player_card(player_id, card)
                     return True
         return False
 
@@ -246,55 +431,36 @@ class GameEngine:
         if location.startswith('hand'):
             player = self.players.get(player_id)
             if player:
-                player.hand.append(card)
+                player.add_card(card)
                 return True
         elif location.startswith('board'):
             board_id = location.split('-')[1]
             board = self.boards.get(board_id)
             if board:
-                # Check capacity based on current cards
-                player_cards = board.get_player_cards(player_id)
-
                 # Allow max 4 cards per board per player
                 # The actual PLO/NL determination happens automatically
-                if len(player_cards) >= 4:
+                count = board.p1_count if player_id == 1 else board.p2_count
+                if count >= 4:
                     return False
 
-                player_cards.append(card)
-                board.set_player_cards(player_id, player_cards)
+                board.add_player_card(player_id, card)
                 return True
         return False
 
     def _determine_board_types(self):
         """Auto-determine board types based on card placement"""
-        # Reset all types
-        for board in self.boards.values():
-            board.type = BoardType.PENDING
-
-        # Find PLO boards for each player
+        # Find PLO boards for each player (the last full board wins)
         p1_plo_board = None
         p2_plo_board = None
-
         for board_id, board in self.boards.items():
-            if len(board.p1_cards) == 4:
+            if board.p1_count == 4:
                 p1_plo_board = board_id
-            if len(board.p2_cards) == 4:
+            if board.p2_count == 4:
                 p2_plo_board = board_id
 
-        # Set board types based on PLO choices
+        # Every board gets its type from whose PLO board it is, no reset pass needed
         for board_id, board in self.boards.items():
-            if board_id == p1_plo_board and board_id == p2_plo_board:
-                # Both players chose same board for PLO
-                board.type = BoardType.BOTH_PLO
-            elif board_id == p1_plo_board:
-                # Only player 1 chose this for PLO
-                board.type = BoardType.P1_PLO
-            elif board_id == p2_plo_board:
-                # Only player 2 chose this for PLO
-                board.type = BoardType.P2_PLO
-            else:
-                # Neither player chose this for PLO
-                board.type = BoardType.NLHE
+            board.type = _PLO_CHOICE_TYPES[board_id == p1_plo_board, board_id == p2_plo_board]
 
     def confirm_placement(self, player_id: int) -> bool:
         """Confirm card placement for current player"""
@@ -325,28 +491,23 @@ class GameEngine:
         if not player:
             return False
 
-        # Count placed cards
-        total_placed = 0
-        has_plo = False
-
-        for board in self.boards.values():
-            player_cards = board.get_player_cards(player_id)
-            count = len(player_cards)
-            total_placed += count
-
-            if count == 4:
-                has_plo = True
-            elif count != 2 and count != 0:
-                return False
-
-        # Must place all 8 cards with 1 PLO and 2 NLHE
-        return total_placed == 8 and has_plo
+        # Every board holds 0, 2 or 4 cards and all 8 are placed; with those
+        # counts a total of 8 always includes a 4 card PLO board
+        boards = self.boards
+        if player_id == 1:
+            a, b, c = boards['A'].p1_count, boards['B'].p1_count, boards['C'].p1_count
+        else:
+            a, b, c = boards['A'].p2_count, boards['B'].p2_count, boards['C'].p2_count
+        if a != 2 and a != 4 and a != 0:
+            return False
+        if b != 2 and b != 4 and b != 0:
+            return False
+        return a + b + c == 8 and (c == 2 or c == 4 or c == 0)
 
     def _deal_turn_river(self):
         """Deal turn and river for all boards"""
         for board in self.boards.values():
-            board.community.extend(self.deck[:2])
-            self.deck = self.deck[2:]
+            board.deal_community(self._draw(2))
 
     def calculate_showdown(self) -> Dict:
         """Calculate showdown results"""
@@ -360,8 +521,8 @@ class GameEngine:
 
         for board_id, board in self.boards.items():
             # Determine if each player should use PLO rules for this board
-            p1_is_plo = board.type in [BoardType.P1_PLO, BoardType.BOTH_PLO]
-            p2_is_plo = board.type in [BoardType.P2_PLO, BoardType.BOTH_PLO]
+            p1_is_plo = board.type in _P1_PLO_TYPES
+            p2_is_plo = board.type in _P2_PLO_TYPES
 
             # Evaluate hands with correct rules for each player
             p1_eval = self._evaluate_best_hand(board.p1_cards, board.community, p1_is_plo)
@@ -443,35 +604,56 @@ class GameEngine:
 
     def _evaluate_best_hand(self, hole_cards: List[Card], community: List[Card], is_plo: bool) -> Dict:
         """Evaluate the best possible hand"""
-        import itertools
-
         if not hole_cards or not community:
             return {'rank': 0, 'value': 0, 'name': 'No cards', 'cards': [], 'used_cards': []}
 
-        best_eval = None
+        # Lower strength is better, so the loops only ever compare ints
+        best = WORST_HAND + 1
         best_cards = []
 
         if is_plo:
             # PLO: Must use exactly 2 hole and 3 community
-            for h2 in itertools.combinations(hole_cards, 2):
-                for c3 in itertools.combinations(community, 3):
-                    hand = list(h2) + list(c3)
-                    eval = self._eval_five_cards(hand)
-                    if best_eval is None or eval['rank'] > best_eval['rank'] or \
-                       (eval['rank'] == best_eval['rank'] and eval['value'] > best_eval['value']):
-                        best_eval = eval
-                        best_cards = hand
+            h = [c.code for c in hole_cards]
+            b = [c.code for c in community]
+            best_idx = None
+            if _eval_numba.AVAILABLE and len(h) == 4 and len(b) == 5:
+                # Compiled kernel for the regular 4-hole, 5-board showdown
+                best, hole_idx, board_idx = _eval_numba.eval_plo(h, b)
+                best_idx = hole_idx + board_idx
+            else:
+                hole_combos = COMBOS_4C2 if len(h) == 4 else index_combos(len(h), 2)
+                board_combos = COMBOS_5C3 if len(b) == 5 else index_combos(len(b), 3)
+                for i0, i1 in hole_combos:
+                    h0, h1 = h[i0], h[i1]
+                    for j0, j1, j2 in board_combos:
+                        strength = eval5(h0, h1, b[j0], b[j1], b[j2])
+                        if strength < best:
+                            best = strength
+                            best_idx = (i0, i1, j0, j1, j2)
+            if best_idx:
+                i0, i1, j0, j1, j2 = best_idx
+                best_cards = [hole_cards[i0], hole_cards[i1], community[j0], community[j1], community[j2]]
         else:
             # NLHE: Best 5 of 7
-            all_cards = hole_cards + community
-            for combo in itertools.combinations(all_cards, 5):
-                eval = self._eval_five_cards(list(combo))
-                if best_eval is None or eval['rank'] > best_eval['rank'] or \
-                   (eval['rank'] == best_eval['rank'] and eval['value'] > best_eval['value']):
-                    best_eval = eval
-                    best_cards = list(combo)
-
-        if best_eval:
+            # Only the codes are combined; cards are resolved from the winning indexes
+            c = [card.code for card in hole_cards]
+            c.extend([card.code for card in community])
+            n_hole = len(hole_cards)
+            best_idx = None
+            if _eval_numba.AVAILABLE and len(c) == 7:
+                best, best_idx = _eval_numba.eval7(c)
+            else:
+                for combo in COMBOS_7C5 if len(c) == 7 else index_combos(len(c), 5):
+                    i0, i1, i2, i3, i4 = combo
+                    strength = eval5(c[i0], c[i1], c[i2], c[i3], c[i4])
+                    if strength < best:
+                        best = strength
+                        best_idx = combo
+            if best_idx:
+                best_cards = [hole_cards[i] if i < n_hole else community[i - n_hole] for i in best_idx]
+
+        if best_cards:
+            best_eval = self._strength_to_eval(best)
             best_eval['cards'] = best_cards
             # Mark which cards were used
             best_eval['used_cards'] = [c.id for c in best_cards]
@@ -479,76 +661,34 @@ class GameEngine:
         
         return {'rank': 0, 'value': 0, 'name': 'No valid hand', 'cards': [], 'used_cards': []}
 
-    def _eval_five_cards(self, cards: List[Card]) -> Dict:
-        """Basic 5-card poker hand evaluation"""
-        if len(cards) != 5:
-            return {'rank': 0, 'value': 0, 'name': 'Invalid'}
-
-        rank_values = {r: i+2 for i, r in enumerate(RANKS)}
-        values = sorted([rank_values[c.rank] for c in cards], reverse=True)
-        suits = [c.suit for c in cards]
-
-        # Count ranks
-        counts = {}
-        for v in values:
-            counts[v] = counts.get(v, 0) + 1
-        groups = sorted([(cnt, v) for v, cnt in counts.items()], reverse=True)
-
-        is_flush = len(set(suits)) == 1
-        is_straight = self._check_straight(values)
-
-        # Determine hand rank
-        if is_flush and is_straight:
-            return {'rank': 8, 'value': max(values), 'name': 'Straight Flush'}
-        elif groups[0][0] == 4:
-            return {'rank': 7, 'value': groups[0][1] * 100, 'name': 'Four of a Kind'}
-        elif groups[0][0] == 3 and len(groups) >= 2 and groups[1][0] == 2:
-            return {'rank': 6, 'value': groups[0][1] * 100 + groups[1][1], 'name': 'Full House'}
-        elif is_flush:
-            return {'rank': 5, 'value': sum(v * (10 ** (4-i)) for i, v in enumerate(values)), 'name': 'Flush'}
-        elif is_straight:
-            return {'rank': 4, 'value': max(values), 'name': 'Straight'}
-        elif groups[0][0] == 3:
-            return {'rank': 3, 'value': groups[0][1] * 100, 'name': 'Three of a Kind'}
-        elif groups[0][0] == 2 and len(groups) >= 2 and groups[1][0] == 2:
-            return {'rank': 2, 'value': groups[0][1] * 100 + groups[1][1], 'name': 'Two Pair'}
-        elif groups[0][0] == 2:
-            return {'rank': 1, 'value': groups[0][1] * 100, 'name': 'One Pair'}
-        else:
-            return {'rank': 0, 'value': sum(v * (10 ** (4-i)) for i, v in enumerate(values)), 'name': 'High Card'}
-
-    def _check_straight(self, values: List[int]) -> bool:
-        """Check if values form a straight"""
-        unique = sorted(set(values), reverse=True)
-        if len(unique) < 5:
-            return False
-
-        # Check wheel (A-2-3-4-5)
-        if set(values) == {14, 5, 4, 3, 2}:
-            return True
-
-        # Check normal straight
-        for i in range(len(unique) - 4):
-            if unique[i] - unique[i+4] == 4:
-                return True
-
-        return False
+    def _strength_to_eval(self, strength: int) -> Dict:
+        """Turn an evaluator strength into the rank/value/name dict used for comparing"""
+        # rank is the hand class (8 = straight flush), value orders hands within
+        # and across classes; both grow with hand strength
+        return {
+            'rank': 8 - hand_class(strength),
+            'value': WORST_HAND + 1 - strength,
+            'name': hand_name(strength)
+        }
 
     def _compare_hands(self, eval1: Dict, eval2: Dict) -> int:
         """Compare two hand evaluations. Returns 1, 2, or 0 (tie)"""
-        if eval1['rank'] > eval2['rank']:
-            return 1
-        elif eval2['rank'] > eval1['rank']:
-            return 2
-        elif eval1['value'] > eval2['value']:
+        # value already orders hands across classes, so rank never needs checking
+        value1 = eval1['value']
+        value2 = eval2['value']
+        if value1 > value2:
             return 1
-        elif eval2['value'] > eval1['value']:
+        elif value2 > value1:
             return 2
         else:
             return 0
 
-    def get_game_state(self, player_id: Optional[int] = None) -> Dict:
-        """Get current game state (filtered for specific player if provided)"""
+    def _display_type(self, board: Board, player_id: Optional[int]) -> str:
+        """Simplify board type for frontend display from a player's perspective"""
+        return display_type(board.type, player_id)
+
+    def get_public_state(self) -> Dict:
+        """Get the part of the game state every viewer in the room may see"""
         state = {
             'room_id': self.room_id,
             'phase': self.phase.value,
@@ -557,52 +697,80 @@ class GameEngine:
             'boards': {}
         }
 
-        # Add board info
+        # One lookup decides every phase-dependent branch below
+        reveal, hide_hands = _PHASE_VIEWS[self.phase]
         for board_id, board in self.boards.items():
-            # Simplify board type for frontend display
-            display_type = board.type.value
-            if board.type == BoardType.BOTH_PLO:
-                display_type = 'plo'
-            elif board.type in [BoardType.P1_PLO, BoardType.P2_PLO]:
-                # Show as mixed during placement, PLO/NL based on player perspective
-                if player_id == 1 and board.type == BoardType.P1_PLO:
-                    display_type = 'plo'
-                elif player_id == 2 and board.type == BoardType.P2_PLO:
-                    display_type = 'plo'
-                elif board.type != BoardType.PENDING:
-                    display_type = 'nlhe'
-
-            board_data = {
-                'type': display_type,
-                'actual_type': board.type.value,  # Keep actual type for debugging
-                'community': [c.to_dict() for c in board.community]
-            }
+            state['boards'][board_id] = board.public_view(reveal)
 
-            # Show cards based on phase and player
-            if self.phase in [GamePhase.SHOWDOWN, GamePhase.COMPLETE]:
-                # Show all cards
-                board_data['p1_cards'] = [c.to_dict() for c in board.p1_cards]
-                board_data['p2_cards'] = [c.to_dict() for c in board.p2_cards]
-            else:
-                # Show only own cards during placement
-                if player_id == 1:
-                    board_data['p1_cards'] = [c.to_dict() for c in board.p1_cards]
-                    board_data['p2_cards'] = [{'hidden': True}] * len(board.p2_cards)
-                elif player_id == 2:
-                    board_data['p1_cards'] = [{'hidden': True}] * len(board.p1_cards)
-                    board_data['p2_cards'] = [c.to_dict() for c in board.p2_cards]
-                else:
-                    # Observer sees card backs
-                    board_data['p1_cards'] = [{'hidden': True}] * len(board.p1_cards)
-                    board_data['p2_cards'] = [{'hidden': True}] * len(board.p2_cards)
-
-            state['boards'][board_id] = board_data
-
-        # Add player info
+        # Add player info, hands are private until the game is complete
         state['players'] = {}
         for pid, player in self.players.items():
-            # Hide opponent's hand
-            hide_hand = (player_id != pid) and self.phase != GamePhase.COMPLETE
-            state['players'][pid] = player.to_dict(hide_hand=hide_hand)
+            state['players'][pid] = player.to_dict(hide_hand=hide_hands)
+
+        return state
+
+    def get_board_types(self, player_id: Optional[int]) -> Dict[str, Dict[str, str]]:
+        """Get each board's display and actual type from a player's perspective"""
+        return {
+            board_id: {
+                'type': self._display_type(board, player_id),
+                'actual_type': board.type.value
+            }
+            for board_id, board in self.boards.items()
+        }
+
+    def get_private_state(self, player_id: int) -> Dict:
+        """Get the part of the game state only the given player may see"""
+        player = self.players.get(player_id)
+        return {
+            'player_id': player_id,
+            'hand': player.hand_view() if player else [],
+            'boards': {
+                board_id: {
+                    'type': self._display_type(board, player_id),
+                    'cards': board.player_view(player_id)
+                }
+                for board_id, board in self.boards.items()
+            }
+        }
+
+    def get_game_state(self, player_id: Optional[int] = None) -> Dict:
+        """Get current game state (filtered for specific player if provided)"""
+        state = self.get_public_state()
+        if player_id not in self.players:
+            return state
+
+        # Overlay the player's own view on top of the public state
+        private = self.get_private_state(player_id)
+        cards_key = 'p1_cards' if player_id == 1 else 'p2_cards'
+        # Copy before overlaying, the public views are cached and shared
+        for board_id, board_data in private['boards'].items():
+            state['boards'][board_id] = dict(state['boards'][board_id], type=board_data['type'])
+            state['boards'][board_id][cards_key] = board_data['cards']
+        state['players'][player_id] = dict(state['players'][player_id], hand=private['hand'])
 
         return state
+
+
+class EnginePool:
+    """Bounded free-list of GameEngine objects recycled across rooms"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._free: List[GameEngine] = []
+
+    def acquire(self, room_id: str) -> GameEngine:
+        """Get a clean engine for a room, reusing a released one if possible"""
+        try:
+            engine = self._free.pop()
+        except IndexError:
+            return GameEngine(room_id)
+        engine.reset(room_id)
+        return engine
+
+    def release(self, engine: GameEngine):
+        """Hand back an engine whose room has closed"""
+        if len(self._free) < self.max_size:
+            with engine.lock:
+                engine.reset(None)
+            self._free.append(engine)
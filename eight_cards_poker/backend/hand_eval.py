@@ -0,0 +1,163 @@
+"""
+Eight Cards Poker - Hand Evaluator
+Cactus Kev style 5-card evaluator: integer card codes plus lookup tables
+"""
+
+import itertools
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Tuple
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+# One prime per rank, so the product of five cards identifies the rank multiset
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Index of each rank (2 = 0 ... A = 12) and suit character
+RANK_INDEX: Dict[str, int] = {r: i for i, r in enumerate(RANKS)}
+SUIT_INDEX: Dict[str, int] = {s: i for i, s in enumerate(SUITS)}
+
+def card_code(rank: str, suit: str) -> int:
+    """Encode a card as xxxAKQJT98765432 CDHSrrrr xxPPPPPP (rank bit, suit bit, rank, prime)"""
+    r = RANK_INDEX[rank]
+    return (1 << (16 + r)) | (1 << (12 + SUIT_INDEX[suit])) | (r << 8) | PRIMES[r]
+
+# Code of every card, keyed by rank + suit (e.g. 'As')
+CARD_CODES: Dict[str, int] = {r + s: card_code(r, s) for s in SUITS for r in RANKS}
+
+# Strength is 1 (royal flush) to 7462 (7-5-4-3-2 offsuit), lower is better.
+# HAND_CLASS_MAX[i] is the weakest strength in class HAND_NAMES[i].
+HAND_NAMES = ('Straight Flush', 'Four of a Kind', 'Full House', 'Flush', 'Straight',
+              'Three of a Kind', 'Two Pair', 'One Pair', 'High Card')
+HAND_CLASS_MAX = (10, 166, 322, 1599, 1609, 2467, 3325, 6185, 7462)
+WORST_HAND = 7462
+
+# 13-bit rank masks of the ten straights, A-high down to the 5-high wheel
+STRAIGHTS = tuple(0x1F << lo for lo in range(8, -1, -1)) + (0x100F,)
+STRAIGHT_MASKS = frozenset(STRAIGHTS)
+
+def _build_tables():
+    """Enumerate all 7462 distinct hands strongest first and index them"""
+    flushes = [0] * 7937   # five distinct ranks, all one suit, by rank bits
+    unique5 = [0] * 7937   # five distinct ranks, mixed suits, by rank bits
+    products: Dict[int, int] = {}  # hands with a paired rank, by prime product
+
+    desc = range(12, -1, -1)
+    # Every other set of five distinct ranks, best (lexicographically highest) first
+    distinct = [sum(1 << r for r in combo) for combo in itertools.combinations(desc, 5)]
+    distinct = [bits for bits in distinct if bits not in STRAIGHT_MASKS]
+
+    def prime_product(ranks):
+        product = 1
+        for r in ranks:
+            product *= PRIMES[r]
+        return product
+
+    strength = 0
+    for bits in STRAIGHTS:
+        strength += 1
+        flushes[bits] = strength
+    for quad in desc:
+        for kicker in desc:
+            if kicker != quad:
+                strength += 1
+                products[prime_product((quad,) * 4 + (kicker,))] = strength
+    for trips in desc:
+        for pair in desc:
+            if pair != trips:
+                strength += 1
+                products[prime_product((trips,) * 3 + (pair,) * 2)] = strength
+    for bits in distinct:
+        strength += 1
+        flushes[bits] = strength
+    for bits in STRAIGHTS:
+        strength += 1
+        unique5[bits] = strength
+    for trips in desc:
+        for kickers in itertools.combinations([r for r in desc if r != trips], 2):
+            strength += 1
+            products[prime_product((trips,) * 3 + kickers)] = strength
+    for high, low in itertools.combinations(desc, 2):
+        for kicker in desc:
+            if kicker != high and kicker != low:
+                strength += 1
+                products[prime_product((high, high, low, low, kicker))] = strength
+    for pair in desc:
+        for kickers in itertools.combinations([r for r in desc if r != pair], 3):
+            strength += 1
+            products[prime_product((pair, pair) + kickers)] = strength
+    for bits in distinct:
+        strength += 1
+        unique5[bits] = strength
+
+    assert strength == WORST_HAND
+    return flushes, unique5, products
+
+FLUSHES, UNIQUE5, PRODUCTS = _build_tables()
+
+def eval5(c1: int, c2: int, c3: int, c4: int, c5: int) -> int:
+    """Strength of five card codes, 1 (best) to 7462 (worst)"""
+    q = (c1 | c2 | c3 | c4 | c5) >> 16
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return FLUSHES[q]
+    strength = UNIQUE5[q]
+    if strength:
+        return strength
+    return PRODUCTS[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+def hand_class(strength: int) -> int:
+    """Index into HAND_NAMES for a strength"""
+    return bisect_left(HAND_CLASS_MAX, strength)
+
+def hand_name(strength: int) -> str:
+    """Human readable class of a strength, e.g. 'Full House'"""
+    return HAND_NAMES[hand_class(strength)]
+
+@lru_cache(maxsize=None)
+def index_combos(n: int, k: int) -> Tuple[Tuple[int, ...], ...]:
+    """All k-of-n index tuples, built once per size and reused by every evaluation"""
+    return tuple(itertools.combinations(range(n), k))
+
+# The sizes every showdown hits: 5 of 7 (NLHE), 2 of 4 hole and 3 of 5 board (PLO)
+COMBOS_7C5 = index_combos(7, 5)
+COMBOS_4C2 = index_combos(4, 2)
+COMBOS_5C3 = index_combos(5, 3)
+
+# Batched evaluation for bulk work such as Monte Carlo equity; needs numpy
+# (optional, see requirements-optional.txt)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    NP_FLUSHES = np.array(FLUSHES, dtype=np.int32)
+    NP_UNIQUE5 = np.array(UNIQUE5, dtype=np.int32)
+    NP_PRODUCT_KEYS = np.array(sorted(PRODUCTS), dtype=np.int64)
+    NP_PRODUCT_VALS = np.array([PRODUCTS[k] for k in sorted(PRODUCTS)], dtype=np.int32)
+    NP_COMBOS_7C5 = np.array(COMBOS_7C5, dtype=np.intp)
+
+def eval_many(hands):
+    """Strengths of an (N, 5) array of card codes as an (N,) int32 array"""
+    if np is None:
+        raise RuntimeError('eval_many needs numpy')
+    hands = np.asarray(hands, dtype=np.int64)
+    q = np.bitwise_or.reduce(hands, axis=1) >> 16
+    flush = (np.bitwise_and.reduce(hands, axis=1) & 0xF000) != 0
+    strength = np.where(flush, NP_FLUSHES[q], NP_UNIQUE5[q])
+    # Paired hands have no rank-bit entry, look their prime product up instead
+    paired = strength == 0
+    if paired.any():
+        product = np.prod(hands[paired] & 0xFF, axis=1)
+        strength[paired] = NP_PRODUCT_VALS[np.searchsorted(NP_PRODUCT_KEYS, product)]
+    return strength
+
+def eval7_many(hands):
+    """Best 5-of-7 strengths of an (N, 7) array of card codes"""
+    if np is None:
+        raise RuntimeError('eval7_many needs numpy')
+    hands = np.asarray(hands, dtype=np.int64)
+    # Gather all 21 five-card subsets of every hand into one (N * 21, 5) batch
+    subsets = hands[:, NP_COMBOS_7C5].reshape(-1, 5)
+    return eval_many(subsets).reshape(-1, len(COMBOS_7C5)).min(axis=1)
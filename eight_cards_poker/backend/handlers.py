@@ -0,0 +1,545 @@
+"""
+Eight Cards Poker - Server Handlers
+HTTP routes and Socket.IO events shared by app.py and old/app_simple.py
+"""
+
+from flask import Flask, request, jsonify, send_from_directory
+from flask_socketio import SocketIO, emit, join_room, leave_room
+from collections import namedtuple
+import logging
+import os
+import secrets
+import string
+import threading
+import time
+from typing import Dict, List, Optional, Set
+from game_engine import GameEngine, EnginePool, GamePhase
+
+# MessagePack is optional; without it showdown results go out as JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+log = logging.getLogger(__name__)
+
+# The server instance events are emitted through, set by register()
+socketio: Optional[SocketIO] = None
+
+# Locking: rooms_lock covers inserts/deletes on game_rooms only. Each game's
+# own lock covers its engine, the room_members entry for its room and the
+# seat-changing part of a session (seating, leaving, closing the room), so a
+# lookup, a seat change and the registry update happen as one step. A handler
+# holds at most one game lock at a time and takes rooms_lock inside it. A
+# sessions entry is only replaced or removed by its own connection's events.
+
+# Store active game rooms, only touch through get_game/add_game/close_game
+game_rooms: Dict[str, GameEngine] = {}
+rooms_lock = threading.Lock()
+# Closed rooms hand their engines back here instead of leaving them to the GC
+engine_pool = EnginePool(max_size=1024)
+# Who a connection is; a tuple so handlers read fields as attributes, not dict keys
+Session = namedtuple('Session', 'room_id player_id player_name')
+# Map session IDs to room and player info
+sessions: Dict[str, Session] = {}
+# Index of session IDs per room so fan-out never scans all sessions
+room_members: Dict[str, Set[str]] = {}
+
+# Hard cap on concurrent rooms so a runaway client cannot exhaust memory
+MAX_ROOMS = int(os.environ.get('MAX_ROOMS', 10000))
+# Each connection may create at most ROOM_CREATE_LIMIT rooms per window (seconds)
+ROOM_CREATE_LIMIT = 5
+ROOM_CREATE_WINDOW = 60.0
+# Recent room creation times per session ID
+room_creations: Dict[str, List[float]] = {}
+
+# Room IDs are this many characters of A-Z and 0-9
+ROOM_ID_LENGTH = 6
+ROOM_ID_ALPHABET = string.ascii_uppercase + string.digits
+
+def generate_room_id() -> str:
+    """Generate an unguessable random room ID not used by any open room"""
+    # secrets draws from the OS CSPRNG, so IDs cannot be predicted from earlier ones
+    while True:
+        room_id = ''.join(secrets.choice(ROOM_ID_ALPHABET) for _ in range(ROOM_ID_LENGTH))
+        if room_id not in game_rooms:
+            return room_id
+
+def allow_room_creation(sid: str) -> bool:
+    """Sliding-window check of how many rooms this connection created lately"""
+    now = time.monotonic()
+    recent = [t for t in room_creations.get(sid, ()) if now - t < ROOM_CREATE_WINDOW]
+    allowed = len(recent) < ROOM_CREATE_LIMIT
+    if allowed:
+        recent.append(now)
+    room_creations[sid] = recent
+    return allowed
+
+def get_game(room_id: str) -> Optional[GameEngine]:
+    """Look up the game for a room (the one place to shard game state later)"""
+    return game_rooms.get(room_id)
+
+def add_game(game: GameEngine):
+    """Register a new game under its room ID"""
+    with rooms_lock:
+        game_rooms[game.room_id] = game
+
+def close_game(game: GameEngine) -> bool:
+    """Forget a finished room; call with game.lock held so no join can slip in"""
+    with rooms_lock:
+        if game_rooms.get(game.room_id) is not game:
+            return False
+        del game_rooms[game.room_id]
+    return True
+
+def leave_current_room(sid: str, session: Optional[Session] = None):
+    """Take a connection out of a room: the given session's, or the one it is seated in"""
+    if session is None:
+        session = sessions.pop(sid, None)
+        if session is None:
+            return
+    room_id = session.room_id
+
+    leave_room(room_id, sid=sid)
+
+    game = get_game(room_id)
+    closed = False
+    if game is not None:
+        with game.lock:
+            drop_member(room_id, sid)
+            if get_game(room_id) is game:
+                game.remove_player(sid)
+                # Unregister before the lock drops, so a waiting join finds the room gone
+                if not game.players:
+                    closed = close_game(game)
+    else:
+        drop_member(room_id, sid)
+
+    # Notify other players
+    emit('player_left', {
+        'player_id': session.player_id
+    }, room=room_id, skip_sid=sid)
+
+    if closed:
+        # Only now is the engine unreachable and safe to recycle
+        engine_pool.release(game)
+        log.info('Room %s closed', room_id)
+
+def seat(sid: str, room_id: str, player_id: int, player_name: str):
+    """Record a connection's seat; call with the room's game.lock held"""
+    sessions[sid] = Session(room_id, player_id, player_name)
+    room_members.setdefault(room_id, set()).add(sid)
+
+def drop_member(room_id: str, sid: str):
+    """Remove a connection from a room's member index"""
+    members = room_members.get(room_id)
+    if members is not None:
+        members.discard(sid)
+        if not members:
+            del room_members[room_id]
+
+def collect_game_state(game: GameEngine, room_id: str):
+    """Snapshot the public state and each seated player's private view"""
+    with game.lock:
+        public = game.get_public_state()
+        private = [(sid, game.get_private_state(sessions[sid].player_id))
+                   for sid in tuple(room_members.get(room_id, ()))
+                   if sid in sessions and sessions[sid].room_id == room_id]
+    return public, private
+
+def emit_private_states(private):
+    """Send each player their own overlay on the public state"""
+    for sid, state in private:
+        socketio.emit('game_state_private', state, room=sid)
+
+def broadcast_game_state(game: GameEngine, room_id: str):
+    """Send the shared state to the whole room, then each player's private view"""
+    # A room emit without a callback is encoded once by the Socket.IO manager
+    # and the same packet is written to every participant, so the public
+    # payload is serialized once per broadcast no matter how many listen
+    public, private = collect_game_state(game, room_id)
+    socketio.emit('game_state_public', public, room=room_id)
+    emit_private_states(private)
+
+# Legacy client served when there is no Vite build
+LEGACY_FRONTEND = os.path.join(os.path.dirname(__file__), '..', 'frontend')
+# Where / and /assets are served from, picked once by register() so requests
+# never probe the filesystem for the build
+index_dir = LEGACY_FRONTEND
+assets_dir = os.path.join(LEGACY_FRONTEND, 'static')
+assets_hashed = False
+
+# Vite content-hashes the file names under dist/assets, so a URL never changes content
+ASSET_MAX_AGE = 31536000
+
+def add_no_cache_headers(response):
+    # Hashed build assets were marked cacheable forever by serve_assets
+    if response.cache_control.immutable:
+        return response
+    # Avoid stale caches causing dev/prod layout differences
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    # Force CSS/JS reload
+    if response.content_type and ('css' in response.content_type or 'javascript' in response.content_type):
+        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
+
+def index():
+    """Serve the game client (built React app in prod)"""
+    return send_from_directory(index_dir, 'index.html', max_age=0)
+
+def serve_assets(path):
+    """Serve built assets from Vite prod build"""
+    if not assets_hashed:
+        return send_from_directory(assets_dir, path)
+    response = send_from_directory(assets_dir, path, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# What /health reports as its status, set by register()
+health_status = 'healthy'
+
+def health_check():
+    """Health check endpoint for deployment"""
+    return jsonify({'status': health_status, 'rooms': len(game_rooms)})
+
+# Socket.IO Events
+
+def handle_connect():
+    """Handle client connection"""
+    log.debug('Client connected: %s', request.sid)
+    emit('connected', {'session_id': request.sid})
+
+def handle_disconnect():
+    """Handle client disconnection"""
+    log.debug('Client disconnected: %s', request.sid)
+    room_creations.pop(request.sid, None)
+    
+    # Leave any active game
+    leave_current_room(request.sid)
+
+def handle_create_room(data):
+    """Create a new game room"""
+    if len(game_rooms) >= MAX_ROOMS:
+        emit('error', {'message': 'Server is full, try again later'})
+        return
+    if not allow_room_creation(request.sid):
+        emit('error', {'message': 'Too many rooms created, slow down'})
+        return
+
+    player_name = data.get('player_name', 'Player 1')
+    room_id = generate_room_id()
+    
+    # Create new game
+    game = engine_pool.acquire(room_id)
+    previous = sessions.get(request.sid)
+    with game.lock:
+        player_id = game.add_player(request.sid, player_name)
+        if player_id:
+            seat(request.sid, room_id, player_id, player_name)
+            add_game(game)
+    
+    if player_id:
+        # A connection sits in one room at a time
+        if previous is not None:
+            leave_current_room(request.sid, previous)
+        
+        join_room(room_id)
+        
+        emit('room_created', {
+            'room_id': room_id,
+            'player_id': player_id,
+            'player_name': player_name
+        })
+        
+        # Send initial game state
+        broadcast_game_state(game, room_id)
+        
+        log.info('Room %s created by %s', room_id, player_name)
+    else:
+        engine_pool.release(game)
+        emit('error', {'message': 'Failed to create room'})
+
+def handle_join_room(data):
+    """Join an existing game room"""
+    room_id = data.get('room_id', '').upper()
+    player_name = data.get('player_name', 'Player 2')
+    
+    game = get_game(room_id)
+    if game is None:
+        emit('error', {'message': 'Room not found'})
+        return
+    previous = sessions.get(request.sid)
+    if previous is not None and previous.room_id == room_id:
+        emit('error', {'message': 'Already in this room'})
+        return
+
+    with game.lock:
+        # The room may have closed and its engine been recycled since the lookup
+        open_room = get_game(room_id) is game and game.room_id == room_id
+        player_id = game.add_player(request.sid, player_name) if open_room else None
+        if player_id:
+            seat(request.sid, room_id, player_id, player_name)
+            public, private = collect_game_state(game, room_id)
+
+    if not open_room:
+        emit('error', {'message': 'Room not found'})
+        return
+    if player_id:
+        # A connection sits in one room at a time
+        if previous is not None:
+            leave_current_room(request.sid, previous)
+        
+        join_room(room_id)
+        
+        # One room-wide message tells the joiner its seat, tells the host who
+        # joined, carries the public state and starts betting once both are in
+        emit('room_sync', {
+            'room_id': room_id,
+            'joined_player_id': player_id,
+            'joined_player_name': player_name,
+            'public_state': public,
+            'ready_to_bet': len(public['players']) == 2
+        }, room=room_id)
+        emit_private_states(private)
+        
+        log.info('%s joined room %s', player_name, room_id)
+    else:
+        emit('error', {'message': 'Room is full'})
+
+def handle_place_bet(data):
+    """Handle bet placement with matching-bet enforcement"""
+    if request.sid not in sessions:
+        emit('error', {'message': 'Not in a game'})
+        return
+
+    session = sessions[request.sid]
+    room_id = session.room_id
+    player_id = session.player_id
+    bet_amount = data.get('amount', 50)
+
+    game = get_game(room_id)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+
+    mismatch = None
+    started = False
+    invalid = False
+    with game.lock:
+        # Store bet intent
+        game.pending_bets[player_id] = bet_amount
+
+        # Proceed only when both players have bet
+        if len(game.pending_bets) == 2:
+            bets = list(game.pending_bets.values())
+            if bets[0] != bets[1]:
+                # Require matching bets for simplicity
+                mismatch = bets
+
+                # Clear the lower bet so both can rebid to the higher
+                max_bet = max(bets)
+                for pid in list(game.pending_bets.keys()):
+                    if game.pending_bets[pid] < max_bet:
+                        del game.pending_bets[pid]
+            # Bets match → place and start game
+            elif game.place_bets(game.pending_bets):
+                game.start_game()
+                game.pending_bets = {}
+                started = True
+            else:
+                invalid = True
+
+    # Always inform room about the bet
+    emit('bet_placed', {
+        'player_id': player_id,
+        'amount': bet_amount
+    }, room=room_id)
+
+    if mismatch is not None:
+        emit('error', {
+            'message': f'Bets must match! One player bet ${mismatch[0]}, the other ${mismatch[1]}. Both need to bet the same amount.'
+        }, room=room_id)
+    elif started:
+        # Send updated game state to all players
+        broadcast_game_state(game, room_id)
+        emit('game_started', {}, room=room_id)
+        log.info('Game started in room %s', room_id)
+    elif invalid:
+        emit('error', {'message': 'Invalid bet amount'}, room=room_id)
+
+def handle_move_card(data):
+    """Handle card movement"""
+    if request.sid not in sessions:
+        emit('error', {'message': 'Not in a game'})
+        return
+    
+    session = sessions[request.sid]
+    room_id = session.room_id
+    player_id = session.player_id
+    
+    game = get_game(room_id)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+    
+    card_id = data.get('card_id')
+    from_location = data.get('from')
+    to_location = data.get('to')
+
+    # Drop malformed or oversized payloads before they reach the engine
+    if not (isinstance(card_id, int) and 0 <= card_id < 52
+            and isinstance(from_location, str) and len(from_location) <= 16
+            and isinstance(to_location, str) and len(to_location) <= 16):
+        emit('error', {'message': 'Invalid move'})
+        return
+    
+    with game.lock:
+        move = game.move_card(player_id, card_id, from_location, to_location)
+        if move is not None:
+            opponent_id = 2 if player_id == 1 else 1
+            ack = dict(move, boards=game.get_board_types(player_id))
+            # The opponent only sees a card back moving, never which card
+            opponent_move = {
+                'player_id': player_id,
+                'from': from_location,
+                'to': to_location,
+                'boards': game.get_board_types(opponent_id)
+            }
+
+    if move is not None:
+        # A move never changes the phase, so send diffs instead of full state
+        emit('move_ack', ack)
+        emit('opponent_move', opponent_move, room=room_id, skip_sid=request.sid)
+    else:
+        emit('error', {'message': 'Invalid move'})
+
+def handle_confirm_placement(data):
+    """Handle placement confirmation"""
+    if request.sid not in sessions:
+        emit('error', {'message': 'Not in a game'})
+        return
+    
+    session = sessions[request.sid]
+    room_id = session.room_id
+    player_id = session.player_id
+    
+    game = get_game(room_id)
+    if game is None:
+        emit('error', {'message': 'Game not found'})
+        return
+    
+    results = None
+    with game.lock:
+        confirmed = game.confirm_placement(player_id)
+        if confirmed:
+            # Snapshot the updated state before the showdown settles the hand
+            public, private = collect_game_state(game, room_id)
+
+            # Check if ready for showdown
+            if game.phase == GamePhase.SHOWDOWN:
+                results = game.calculate_showdown()
+
+    if not confirmed:
+        emit('error', {'message': 'Invalid placement'})
+        return
+
+    # Send updated state
+    socketio.emit('game_state_public', public, room=room_id)
+    emit_private_states(private)
+
+    if results is not None:
+        # The largest message of a hand, sent as a compact binary attachment
+        # when MessagePack is available (the client decodes either form)
+        if msgpack is not None:
+            results = msgpack.packb(results)
+        emit('showdown_results', results, room=room_id)
+
+def handle_rematch(data):
+    """Handle rematch request and fully reset boards"""
+    if request.sid not in sessions:
+        return
+
+    session = sessions[request.sid]
+    room_id = session.room_id
+    player_id = session.player_id
+
+    game = get_game(room_id)
+    if game is None:
+        return
+
+    with game.lock:
+        # Track rematch requests
+        game.rematch_requests.add(player_id)
+
+        if len(game.rematch_requests) == 2:
+            # Both want rematch - reset for new game
+            game.rematch_requests = set()
+            game.phase = GamePhase.WAITING
+
+            # Reset player bets and ready status
+            for player in game.players.values():
+                player.bet = 0
+                player.ready = False
+                player.hand = []
+                player.hand_ids = set()
+
+            # Clear boards completely
+            for board in game.boards.values():
+                board.clear()
+            rematch = True
+        else:
+            rematch = False
+
+    if rematch:
+        emit('ready_to_bet', {}, room=room_id)
+    else:
+        emit('rematch_requested', {'player_id': player_id}, room=room_id)
+
+def handle_message(data):
+    """Handle chat messages"""
+    if request.sid not in sessions:
+        return
+    
+    session = sessions[request.sid]
+    room_id = session.room_id
+    player_name = session.player_name
+    message = data.get('message', '')
+    
+    if message and len(message) < 200:  # Limit message length
+        emit('chat_message', {
+            'player_name': player_name,
+            'message': message
+        }, room=room_id)
+
+def register(app: Flask, sio: SocketIO, health: str = 'healthy'):
+    """Attach the HTTP routes and Socket.IO events to a server instance"""
+    global socketio, index_dir, assets_dir, assets_hashed, health_status
+    socketio = sio
+    health_status = health
+
+    # Prefer the built React app (prod), fall back to the legacy static client
+    dist_path = app.static_folder
+    if os.path.exists(os.path.join(dist_path, 'index.html')):
+        index_dir = dist_path
+    dist_assets = os.path.join(dist_path, 'assets')
+    if os.path.exists(dist_assets):
+        assets_dir = dist_assets
+        assets_hashed = True
+
+    app.after_request(add_no_cache_headers)
+    app.add_url_rule('/', view_func=index)
+    app.add_url_rule('/assets/<path:path>', view_func=serve_assets)
+    app.add_url_rule('/health', view_func=health_check)
+
+    sio.on_event('connect', handle_connect)
+    sio.on_event('disconnect', handle_disconnect)
+    sio.on_event('create_room', handle_create_room)
+    sio.on_event('join_room', handle_join_room)
+    sio.on_event('place_bet', handle_place_bet)
+    sio.on_event('move_card', handle_move_card)
+    sio.on_event('confirm_placement', handle_confirm_placement)
+    sio.on_event('request_rematch', handle_rematch)
+    sio.on_event('send_message', handle_message)
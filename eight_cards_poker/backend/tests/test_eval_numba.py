@@ -0,0 +1,27 @@
+"""The compiled best-hand search must pick the same hands as the pure-Python loops"""
+
+import random
+
+import pytest
+
+pytest.importorskip('numba')
+
+import _eval_numba
+from game_engine import GameEngine, _CANONICAL_DECK
+
+def _deals(n, size, seed=7):
+    rng = random.Random(seed)
+    return [rng.sample(_CANONICAL_DECK, size) for _ in range(n)]
+
+@pytest.mark.parametrize('is_plo', [False, True])
+def test_best_hand_matches_pure_python(monkeypatch, is_plo):
+    engine = GameEngine('TEST')
+    n_hole = 4 if is_plo else 2
+    for cards in _deals(500, n_hole + 5):
+        hole, community = cards[:n_hole], cards[n_hole:]
+        monkeypatch.setattr(_eval_numba, 'AVAILABLE', True)
+        compiled = engine._evaluate_best_hand(hole, community, is_plo)
+        monkeypatch.setattr(_eval_numba, 'AVAILABLE', False)
+        python = engine._evaluate_best_hand(hole, community, is_plo)
+        assert compiled['value'] == python['value']
+        assert compiled['used_cards'] == python['used_cards']
@@ -0,0 +1,85 @@
+"""Showdown ordering, public/private state split and engine pooling"""
+
+from game_engine import GameEngine, EnginePool, GamePhase, _CARDS_BY_ID
+
+def _cards(*names):
+    by_name = {c.rank + c.suit: c for c in _CARDS_BY_ID.values()}
+    return [by_name[n] for n in names]
+
+def _started_game():
+    game = GameEngine('TEST')
+    game.add_player('sid1', 'Alice')
+    game.add_player('sid2', 'Bob')
+    assert game.place_bets({1: 50, 2: 50})
+    assert game.start_game(seed=1234)
+    return game
+
+def test_compare_hands_orders_by_strength():
+    game = GameEngine('TEST')
+    board = _cards('Ah', 'Kd', '7c', '4s', '2h')
+    pair = game._evaluate_best_hand(_cards('As', '9d'), board, False)
+    two_pair = game._evaluate_best_hand(_cards('Ac', 'Ks'), board, False)
+    better_kicker = game._evaluate_best_hand(_cards('Ad', 'Qc'), board, False)
+    assert pair['name'] == 'One Pair'
+    assert two_pair['name'] == 'Two Pair'
+    assert game._compare_hands(two_pair, pair) == 1
+    assert game._compare_hands(pair, two_pair) == 2
+    assert game._compare_hands(better_kicker, pair) == 1
+    assert game._compare_hands(pair, dict(pair)) == 0
+    # No hand at all loses to any real hand
+    empty = game._evaluate_best_hand([], board, False)
+    assert game._compare_hands(empty, pair) == 2
+
+def test_plo_must_use_two_hole_cards():
+    game = GameEngine('TEST')
+    # Four spades on board, but only one in hand: no flush under PLO rules
+    board = _cards('As', 'Ks', '8s', '4s', '2d')
+    hole = _cards('Qs', 'Jd', '9c', '3h')
+    assert game._evaluate_best_hand(hole, board, True)['name'] != 'Flush'
+    assert game._evaluate_best_hand(hole[:2], board, False)['name'] == 'Flush'
+
+def test_public_state_hides_hands_before_the_end():
+    game = _started_game()
+    assert game.phase == GamePhase.PLACING
+    public = game.get_public_state()
+    for player in public['players'].values():
+        assert player['hand'] == []
+    hand_ids = {c.id for p in game.players.values() for c in p.hand}
+    for board in public['boards'].values():
+        assert all(card == {'hidden': True} for card in board['p1_cards'] + board['p2_cards'])
+        assert not hand_ids & {c['id'] for c in board['community']}
+
+def test_private_state_only_shows_own_cards():
+    game = _started_game()
+    for pid, opponent in ((1, 2), (2, 1)):
+        private = game.get_private_state(pid)
+        seen = {c['id'] for c in private['hand']}
+        assert seen == {c.id for c in game.players[pid].hand}
+        assert not seen & {c.id for c in game.players[opponent].hand}
+
+def test_hands_are_revealed_when_complete():
+    game = _started_game()
+    game.phase = GamePhase.COMPLETE
+    public = game.get_public_state()
+    for pid, player in game.players.items():
+        assert [c['id'] for c in public['players'][pid]['hand']] == [c.id for c in player.hand]
+
+def test_pool_recycles_a_clean_engine():
+    pool = EnginePool(max_size=1)
+    game = _started_game()
+    boards = dict(game.boards)
+    pool.release(game)
+    assert game.room_id is None
+
+    reused = pool.acquire('NEXT')
+    assert reused is game
+    assert reused.room_id == 'NEXT'
+    assert reused.players == {}
+    assert reused.phase == GamePhase.WAITING
+    assert reused.pending_bets == {} and reused.rematch_requests == set()
+    # The same Board objects come back, emptied
+    for board_id, board in reused.boards.items():
+        assert board is boards[board_id]
+        assert board.community == [] and board.p1_count == 0 and board.p2_count == 0
+    # The pool is empty again, so the next room gets a new engine
+    assert pool.acquire('OTHER') is not game
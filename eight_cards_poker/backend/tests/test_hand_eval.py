@@ -0,0 +1,39 @@
+"""Hand evaluator tables and the batched numpy helpers"""
+
+import random
+
+import pytest
+
+from hand_eval import CARD_CODES, COMBOS_7C5, eval5, hand_name
+
+def _codes(*cards):
+    return [CARD_CODES[c] for c in cards]
+
+def test_eval5_orders_hand_classes():
+    hands = [
+        ('Straight Flush', _codes('As', 'Ks', 'Qs', 'Js', 'Ts')),
+        ('Four of a Kind', _codes('9c', '9d', '9h', '9s', '2c')),
+        ('Full House', _codes('3c', '3d', '3h', '2s', '2c')),
+        ('Flush', _codes('Ah', 'Jh', '8h', '4h', '2h')),
+        ('Straight', _codes('5c', '4d', '3h', '2s', 'Ac')),
+        ('Three of a Kind', _codes('7c', '7d', '7h', 'Ks', '2c')),
+        ('Two Pair', _codes('Kc', 'Kd', '5h', '5s', '2c')),
+        ('One Pair', _codes('Ac', 'Ad', '9h', '5s', '2c')),
+        ('High Card', _codes('Ac', 'Jd', '9h', '5s', '2c')),
+    ]
+    strengths = [eval5(*codes) for _, codes in hands]
+    assert strengths == sorted(strengths)
+    assert [hand_name(s) for s in strengths] == [name for name, _ in hands]
+    assert eval5(*_codes('As', 'Ks', 'Qs', 'Js', 'Ts')) == 1
+    assert eval5(*_codes('7c', '5d', '4h', '3s', '2c')) == 7462
+
+def test_eval7_many_matches_eval5():
+    np = pytest.importorskip('numpy')
+    from hand_eval import eval_many, eval7_many
+
+    rng = random.Random(11)
+    deck = list(CARD_CODES.values())
+    hands = [rng.sample(deck, 7) for _ in range(500)]
+    expected = [min(eval5(*(h[i] for i in combo)) for combo in COMBOS_7C5) for h in hands]
+    assert eval7_many(np.array(hands)).tolist() == expected
+    assert eval_many(np.array([h[:5] for h in hands])).tolist() == [eval5(*h[:5]) for h in hands]
@@ -0,0 +1,106 @@
+"""Room lifecycle through the Socket.IO handlers: seats, leaving and engine reuse"""
+
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO
+
+import handlers
+
+@pytest.fixture
+def server(monkeypatch):
+    # Fresh registries per test, the handlers keep them at module level
+    monkeypatch.setattr(handlers, 'game_rooms', {})
+    monkeypatch.setattr(handlers, 'sessions', {})
+    monkeypatch.setattr(handlers, 'room_members', {})
+    monkeypatch.setattr(handlers, 'room_creations', {})
+    monkeypatch.setattr(handlers, 'engine_pool', handlers.EnginePool(max_size=4))
+    app = Flask(__name__)
+    sio = SocketIO(app, async_mode='threading')
+    handlers.register(app, sio)
+    return app, sio
+
+def _events(client, name):
+    return [msg['args'][0] for msg in client.get_received() if msg['name'] == name]
+
+def _client(server):
+    app, sio = server
+    client = sio.test_client(app)
+    # The server's sid for this client, as handed out on connect
+    client.server_sid = _events(client, 'connected')[0]['session_id']
+    return client
+
+def _create(client):
+    client.emit('create_room', {'player_name': 'Host'})
+    return _events(client, 'room_created')[0]['room_id']
+
+def test_join_syncs_both_players(server):
+    host, guest = _client(server), _client(server)
+    room_id = _create(host)
+    guest.emit('join_room', {'room_id': room_id, 'player_name': 'Guest'})
+
+    for client in (host, guest):
+        sync = [m['args'][0] for m in client.get_received() if m['name'] == 'room_sync']
+        assert sync[-1]['room_id'] == room_id
+        assert sync[-1]['joined_player_id'] == 2
+        assert sync[-1]['ready_to_bet']
+
+def test_private_state_goes_to_its_owner_only(server):
+    host, guest = _client(server), _client(server)
+    room_id = _create(host)
+    guest.emit('join_room', {'room_id': room_id})
+    host.emit('place_bet', {'amount': 50})
+    guest.emit('place_bet', {'amount': 50})
+
+    game = handlers.get_game(room_id)
+    for client, pid in ((host, 1), (guest, 2)):
+        received = client.get_received()
+        private = [m['args'][0] for m in received if m['name'] == 'game_state_private'][-1]
+        public = [m['args'][0] for m in received if m['name'] == 'game_state_public'][-1]
+        assert private['player_id'] == pid
+        assert {c['id'] for c in private['hand']} == {c.id for c in game.players[pid].hand}
+        assert all(p['hand'] == [] for p in public['players'].values())
+
+def test_leaving_for_another_room_stops_the_old_rooms_private_state(server):
+    host, guest = _client(server), _client(server)
+    room_a = _create(host)
+    guest.emit('join_room', {'room_id': room_a})
+    guest.emit('create_room', {'player_name': 'Guest'})
+    room_b = _events(guest, 'room_created')[0]['room_id']
+    host.get_received()
+
+    handlers.broadcast_game_state(handlers.get_game(room_a), room_a)
+    assert _events(guest, 'game_state_private') == []
+    assert [s['player_id'] for s in _events(host, 'game_state_private')] == [1]
+    assert handlers.room_members == {room_a: {host.server_sid}, room_b: {guest.server_sid}}
+    assert list(handlers.get_game(room_a).players) == [1]
+
+def test_last_player_leaving_pools_the_engine(server):
+    host = _client(server)
+    room_id = _create(host)
+    game = handlers.get_game(room_id)
+    host.disconnect()
+
+    assert handlers.get_game(room_id) is None
+    assert room_id not in handlers.room_members
+    assert handlers.engine_pool._free == [game]
+
+    guest = _client(server)
+    guest.emit('join_room', {'room_id': room_id})
+    assert _events(guest, 'error') == [{'message': 'Room not found'}]
+
+def test_join_refuses_an_engine_closed_after_lookup(server, monkeypatch):
+    host, guest = _client(server), _client(server)
+    room_id = _create(host)
+    stale = handlers.get_game(room_id)
+    host.disconnect()
+    assert handlers.engine_pool._free == [stale]
+
+    # The guest's lookup raced the close and still holds the old engine
+    lookups = iter([stale])
+    real_get_game = handlers.get_game
+    monkeypatch.setattr(handlers, 'get_game', lambda rid: next(lookups, None) or real_get_game(rid))
+    guest.emit('join_room', {'room_id': room_id})
+
+    assert _events(guest, 'error') == [{'message': 'Room not found'}]
+    assert stale.players == {}
+    assert guest.server_sid not in handlers.sessions
@@ -4,6 +4,7 @@ import ChatInput from './components/ChatInput';
 import CardView from './components/CardView';
 import BoardComponent from './components/Board';
 import ShowdownOverlay from './components/ShowdownOverlay';
+import { decodeMsgpack } from './msgpack';
 
 type Card = { rank?: string; suit?: string; id?: number; hidden?: boolean };
 type Board = {
@@ -41,6 +42,83 @@ type ShowdownResult = {
   final_bankrolls?: Record<number, number>;
 };
 
+// Per-player part of the state, overlaid on the room-wide public state
+type PrivateState = {
+  player_id: number;
+  hand: Card[];
+  boards: Record<'A' | 'B' | 'C', { type: string; cards: Card[] }>;
+};
+
+// Broadcast to the room when a player joins
+type RoomSync = {
+  room_id: string;
+  joined_player_id: number;
+  joined_player_name: string;
+  public_state: GameState;
+  ready_to_bet: boolean;
+};
+
+function mergeState(pub: GameState, priv: PrivateState): GameState {
+  const cardsKey = priv.player_id === 1 ? 'p1_cards' : 'p2_cards';
+  const boards = { ...pub.boards };
+  (Object.keys(priv.boards) as Array<'A' | 'B' | 'C'>).forEach((id) => {
+    boards[id] = { ...pub.boards[id], type: priv.boards[id].type, [cardsKey]: priv.boards[id].cards };
+  });
+  const players = { ...pub.players };
+  if (players[priv.player_id]) {
+    players[priv.player_id] = { ...players[priv.player_id], hand: priv.hand };
+  }
+  return { ...pub, boards, players };
+}
+
+// A single card move; the opponent's copy omits card_id so the card stays hidden
+type MoveDiff = {
+  player_id: number;
+  card_id?: number;
+  from: string;
+  to: string;
+  boards: Record<'A' | 'B' | 'C', { type: string; actual_type: string }>;
+};
+
+function applyMove(state: GameState, move: MoveDiff): GameState {
+  const cardsKey = move.player_id === 1 ? 'p1_cards' : 'p2_cards';
+  const boards = { ...state.boards };
+  (Object.keys(move.boards) as Array<'A' | 'B' | 'C'>).forEach((id) => {
+    boards[id] = { ...state.boards[id], ...move.boards[id] };
+  });
+  const player = state.players[move.player_id];
+  let hand = player ? player.hand : [];
+  const boardId = (loc: string) => loc.split('-')[1] as 'A' | 'B' | 'C';
+
+  // Opponent cards are card backs, so any one of them stands in for the moved card
+  const take = (cards: Card[]) => {
+    const idx = move.card_id === undefined ? cards.length - 1 : cards.findIndex((c) => c.id === move.card_id);
+    if (idx < 0) return { card: { hidden: true } as Card, rest: cards };
+    return { card: cards[idx], rest: [...cards.slice(0, idx), ...cards.slice(idx + 1)] };
+  };
+
+  let card: Card;
+  if (move.from.startsWith('hand')) {
+    ({ card, rest: hand } = take(hand));
+  } else {
+    const id = boardId(move.from);
+    const taken = take(boards[id][cardsKey]);
+    card = taken.card;
+    boards[id] = { ...boards[id], [cardsKey]: taken.rest };
+  }
+
+  if (move.to.startsWith('hand')) {
+    // The opponent's hand is never sent, so only our own hand grows
+    if (move.card_id !== undefined) hand = [...hand, card];
+  } else {
+    const id = boardId(move.to);
+    boards[id] = { ...boards[id], [cardsKey]: [...boards[id][cardsKey], card] };
+  }
+
+  const players = player ? { ...state.players, [move.player_id]: { ...player, hand } } : state.players;
+  return { ...state, boards, players };
+}
+
 // suit helpers moved into CardView component
 
 export default function App() {
@@ -59,6 +137,7 @@ export default function App() {
   const [showdownResults, setShowdownResults] = useState<ShowdownResult | null>(null);
   const [showingShowdown, setShowingShowdown] = useState(false);
   const activeDropZoneRef = useRef<HTMLElement | null>(null);
+  const publicStateRef = useRef<GameState | null>(null);
   const draggingElRef = useRef<HTMLElement | null>(null);
   const [chatOpen, setChatOpen] = useState(true);
 
@@ -90,20 +169,32 @@ export default function App() {
       // visual indicator via CSS could be added
     });
 
-    s.on('room_created', (data: { room_id: string; player_id: number }) => {
-      setRoomId(data.room_id);
-      setMyPlayerId(data.player_id);
-    });
+    // The room this client sits in, updated whenever it creates or joins one
+    let myRoom: string | null = null;
 
-    s.on('room_joined', (data: { room_id: string; player_id: number }) => {
+    s.on('room_created', (data: { room_id: string; player_id: number }) => {
+      myRoom = data.room_id;
       setRoomId(data.room_id);
       setMyPlayerId(data.player_id);
-      // go to game screen
-      setShowBetModal(false);
     });
 
-    s.on('player_joined', () => {
-      // optional system message
+    // One message to the whole room per join: the joiner learns its seat,
+    // everyone gets the public state and, with both seats filled, starts betting
+    s.on('room_sync', (data: RoomSync) => {
+      publicStateRef.current = data.public_state;
+      // A sync for a room other than ours means we are the one who just joined it
+      if (data.room_id !== myRoom) {
+        myRoom = data.room_id;
+        setRoomId(data.room_id);
+        setMyPlayerId(data.joined_player_id);
+        // go to game screen
+        setShowBetModal(false);
+      }
+      if (data.ready_to_bet) {
+        setShowBetModal(true);
+        setOpponentBet(null);
+        setWaitingForOpponent(false);
+      }
     });
 
     s.on('ready_to_bet', () => {
@@ -122,12 +213,11 @@ export default function App() {
       }
     });
 
-    s.on('game_started', (state: GameState) => {
-      setGame(state);
+    s.on('game_started', () => {
       setShowBetModal(false);
     });
 
-    s.on('game_state', (state: GameState) => {
+    const applyGameState = (state: GameState) => {
       // Check if we're entering showdown phase
       if (game && state.phase === 'showdown' && game.phase !== 'showdown') {
         // Animate ALL hidden cards being revealed
@@ -181,9 +271,28 @@ export default function App() {
         }, 300);
       }
       setGame(state);
+    };
+
+    // Room-wide state arrives first, then this player's private overlay
+    s.on('game_state_public', (state: GameState) => {
+      publicStateRef.current = state;
     });
 
-    s.on('showdown_results', (data: ShowdownResult) => {
+    s.on('game_state_private', (priv: PrivateState) => {
+      if (!publicStateRef.current) return;
+      applyGameState(mergeState(publicStateRef.current, priv));
+    });
+
+    // Card moves arrive as diffs against the last full state
+    const onMove = (move: MoveDiff) => {
+      setGame((prev) => (prev ? applyMove(prev, move) : prev));
+    };
+    s.on('move_ack', onMove);
+    s.on('opponent_move', onMove);
+
+    s.on('showdown_results', (payload: ShowdownResult | ArrayBuffer) => {
+      // Sent as MessagePack when the server has it, otherwise as JSON
+      const data: ShowdownResult = payload instanceof ArrayBuffer ? decodeMsgpack(payload) : payload;
       // Delay overlay to appear after all cards have been revealed
       setTimeout(() => {
         setShowdownResults(data);
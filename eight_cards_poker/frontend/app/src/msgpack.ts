@@ -0,0 +1,72 @@
+// Minimal MessagePack decoder for the binary payloads the server sends
+// (showdown results). Map keys are stringified the same way JSON would.
+
+export function decodeMsgpack(buffer: ArrayBuffer | Uint8Array): any {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const text = new TextDecoder();
+  let pos = 0;
+
+  const str = (len: number) => {
+    const s = text.decode(bytes.subarray(pos, pos + len));
+    pos += len;
+    return s;
+  };
+  const bin = (len: number) => {
+    const b = bytes.slice(pos, pos + len);
+    pos += len;
+    return b;
+  };
+  const array = (len: number) => {
+    const out = new Array(len);
+    for (let i = 0; i < len; i++) out[i] = read();
+    return out;
+  };
+  const map = (len: number) => {
+    const out: Record<string, any> = {};
+    for (let i = 0; i < len; i++) {
+      const key = read();
+      out[String(key)] = read();
+    }
+    return out;
+  };
+
+  function read(): any {
+    const b = bytes[pos++];
+    if (b <= 0x7f) return b;
+    if (b <= 0x8f) return map(b & 0x0f);
+    if (b <= 0x9f) return array(b & 0x0f);
+    if (b <= 0xbf) return str(b & 0x1f);
+    if (b >= 0xe0) return b - 0x100;
+
+    let v: any;
+    switch (b) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: v = bin(bytes[pos++]); return v;
+      case 0xc5: v = view.getUint16(pos); pos += 2; return bin(v);
+      case 0xc6: v = view.getUint32(pos); pos += 4; return bin(v);
+      case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+      case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+      case 0xcc: return bytes[pos++];
+      case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+      case 0xce: v = view.getUint32(pos); pos += 4; return v;
+      case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+      case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+      case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+      case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+      case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+      case 0xd9: return str(bytes[pos++]);
+      case 0xda: v = view.getUint16(pos); pos += 2; return str(v);
+      case 0xdb: v = view.getUint32(pos); pos += 4; return str(v);
+      case 0xdc: v = view.getUint16(pos); pos += 2; return array(v);
+      case 0xdd: v = view.getUint32(pos); pos += 4; return array(v);
+      case 0xde: v = view.getUint16(pos); pos += 2; return map(v);
+      case 0xdf: v = view.getUint32(pos); pos += 4; return map(v);
+    }
+    throw new Error(`Unsupported MessagePack type 0x${b.toString(16)}`);
+  }
+
+  return read();
+}
@@ -0,0 +1,166 @@
+
+# ctcore.py
+# Board core shared by the Tetris engines: pieces, precomputed masks, drop and line clear
+from typing import List
+import ctengine_fast
+
+WIDTH, HEIGHT = 10, 20
+FULL_ROW = (1 << WIDTH) - 1
+
+TETROMINOS = {
+    'I': [
+        [(0,1),(1,1),(2,1),(3,1)],
+        [(2,0),(2,1),(2,2),(2,3)],
+        [(0,2),(1,2),(2,2),(3,2)],
+        [(1,0),(1,1),(1,2),(1,3)],
+    ],
+    'O': [
+        [(1,0),(2,0),(1,1),(2,1)],
+        [(1,0),(2,0),(1,1),(2,1)],
+        [(1,0),(2,0),(1,1),(2,1)],
+        [(1,0),(2,0),(1,1),(2,1)],
+    ],
+    'T': [
+        [(1,0),(0,1),(1,1),(2,1)],
+        [(1,0),(1,1),(2,1),(1,2)],
+        [(0,1),(1,1),(2,1),(1,2)],
+        [(1,0),(0,1),(1,1),(1,2)],
+    ],
+    'J': [
+        [(0,0),(0,1),(1,1),(2,1)],
+        [(1,0),(2,0),(1,1),(1,2)],
+        [(0,1),(1,1),(2,1),(2,2)],
+        [(1,0),(1,1),(0,2),(1,2)],
+    ],
+    'L': [
+        [(2,0),(0,1),(1,1),(2,1)],
+        [(1,0),(1,1),(1,2),(2,2)],
+        [(0,1),(1,1),(2,1),(0,2)],
+        [(0,0),(1,0),(1,1),(1,2)],
+    ],
+    'S': [
+        [(1,0),(2,0),(0,1),(1,1)],
+        [(1,0),(1,1),(2,1),(2,2)],
+        [(1,1),(2,1),(0,2),(1,2)],
+        [(0,0),(0,1),(1,1),(1,2)],
+    ],
+    'Z': [
+        [(0,0),(1,0),(1,1),(2,1)],
+        [(2,0),(1,1),(2,1),(1,2)],
+        [(0,1),(1,1),(1,2),(2,2)],
+        [(1,0),(0,1),(1,1),(0,2)],
+    ]
+}
+
+PIECE_NAMES = tuple(TETROMINOS)
+
+def _piece_meta(cells):
+    min_x = min(x for x,_ in cells)
+    max_x = max(x for x,_ in cells)
+    dys = sorted({cy for _, cy in cells})
+    rows = tuple((dy, sum(1 << (cx - min_x) for cx, cy in cells if cy == dy)) for dy in dys)
+    floors = tuple((cx - min_x, HEIGHT - max(cy for x, cy in cells if x == cx)) for cx in sorted({x for x,_ in cells}))
+    return min_x, max_x, rows, dys[-1], floors
+
+# Per (piece, rotation): (min_x, max_x, rows, max_dy, floors), where rows holds
+# (dy, row_mask) for each row the piece covers, top to bottom, and floors holds
+# (dx, HEIGHT - lowest dy) for each column, so floor - column height is where
+# that column first hits the stack. Masks and dx start at the piece's leftmost
+# cell, so they shift by x_offset + min_x.
+PIECE_META = {
+    (name, rot): _piece_meta(cells)
+    for name, rots in TETROMINOS.items()
+    for rot, cells in enumerate(rots)
+}
+
+# Row masks as arrays for the compiled column sweep, when numba is installed
+FAST_ROWS = {key: ctengine_fast.piece_table(meta[2]) for key, meta in PIECE_META.items()} if ctengine_fast.AVAILABLE else None
+
+def make_grid():
+    # piece letters as ASCII, row-major (cell x, y at y*WIDTH + x), '.' when empty
+    return bytearray(b'.' * (WIDTH * HEIGHT))
+
+def make_rows():
+    # occupancy bitboard: one int per row, bit x set when column x is filled
+    return [0] * HEIGHT
+
+def make_heights():
+    # per column: HEIGHT minus the topmost filled row, 0 when empty
+    return [0] * WIDTH
+
+def grid_to_strings(grid: bytearray) -> List[str]:
+    text = grid.decode('ascii')
+    return [text[i:i + WIDTH] for i in range(0, WIDTH * HEIGHT, WIDTH)]
+
+def hard_drop_position(rows, piece_name, rotation, x_offset):
+    rotation %= 4
+    min_x, max_x, piece_rows, max_dy, _ = PIECE_META[piece_name, rotation]
+    # horizontal bounds check
+    if x_offset + min_x < 0 or x_offset + max_x >= WIDTH:
+        return None
+    shift = x_offset + min_x
+    # rows above the stack are empty, nothing can collide there
+    top = 0
+    while top < HEIGHT and not rows[top]:
+        top += 1
+    # The piece first collides at the smallest y where any of its rows overlaps;
+    # scan each row down only as far as the best landing found so far
+    land = HEIGHT - max_dy
+    for dy, mask in piece_rows:
+        mask <<= shift
+        y = top - dy if top > dy else 0
+        if y < land:
+            while y < land and not rows[y + dy] & mask:
+                y += 1
+            land = y
+    y = land - 1
+    if y < 0:
+        # no room to drop: valid only if it fits as is, above the top edge
+        for dy, mask in piece_rows:
+            if y + dy < 0 or rows[y + dy] & (mask << shift):
+                return None
+    return [(x_offset + cx, y + cy) for (cx,cy) in TETROMINOS[piece_name][rotation]]
+
+def lock_and_clear(grid, rows, heights, piece_name, cells) -> int:
+    for (x,y) in cells:
+        if y < 0:
+            return -1  # topped
+        grid[y*WIDTH + x] = ord(piece_name)
+        rows[y] |= 1 << x
+        if HEIGHT - y > heights[x]:
+            heights[x] = HEIGHT - y
+    # clear lines: only rows the piece landed in can have become full
+    full = sorted(y for y in {y for _, y in cells} if rows[y] == FULL_ROW)
+    if full:
+        # rebuild both boards in one pass, splicing the runs of rows between the full ones
+        kept_grid = bytearray(b'.' * (WIDTH * len(full)))
+        kept_rows = [0] * len(full)
+        start = 0
+        for y in full + [HEIGHT]:
+            kept_grid += grid[start*WIDTH:y*WIDTH]
+            kept_rows += rows[start:y]
+            start = y + 1
+        grid[:] = kept_grid
+        rows[:] = kept_rows
+        for x in range(WIDTH):
+            bit = 1 << x
+            heights[x] = HEIGHT - next((y for y, row in enumerate(rows) if row & bit), HEIGHT)
+    return len(full)
+
+def _specialize_probe(name, rotation):
+    # Straight-line column-height probe for one piece and rotation. Every column
+    # is below its floor for each x, or the stack reaches the rows the piece
+    # starts in; then holes matter and it returns None for the exact search.
+    min_x, max_x, _, _, floors = PIECE_META[name, rotation]
+    src = ['def probe(heights):', '    cols = []']
+    for shift in range(WIDTH - max_x + min_x):
+        fits = ' and '.join('heights[%d] < %d' % (shift + dx, floor) for dx, floor in floors)
+        src.append('    if not (%s): return None' % fits)
+        src.append('    cols.append(%d)' % (shift - min_x))
+    src.append('    return cols')
+    namespace = {}
+    exec('\n'.join(src), namespace)
+    return namespace['probe']
+
+# (piece, rotation) -> probe(heights): the valid x list, or None near the top
+COLUMN_PROBES = {key: _specialize_probe(*key) for key in PIECE_META}
@@ -1,130 +1,17 @@
 
 # ctduel_engine.py
 from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Optional
-import time, random, copy
-
-WIDTH, HEIGHT = 10, 20
-
-TETROMINOS = {
-    'I': [
-        [(0,1),(1,1),(2,1),(3,1)],
-        [(2,0),(2,1),(2,2),(2,3)],
-        [(0,2),(1,2),(2,2),(3,2)],
-        [(1,0),(1,1),(1,2),(1,3)],
-    ],
-    'O': [
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-    ],
-    'T': [
-        [(1,0),(0,1),(1,1),(2,1)],
-        [(1,0),(1,1),(2,1),(1,2)],
-        [(0,1),(1,1),(2,1),(1,2)],
-        [(1,0),(0,1),(1,1),(1,2)],
-    ],
-    'J': [
-        [(0,0),(0,1),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(1,2)],
-        [(0,1),(1,1),(2,1),(2,2)],
-        [(1,0),(1,1),(0,2),(1,2)],
-    ],
-    'L': [
-        [(2,0),(0,1),(1,1),(2,1)],
-        [(1,0),(1,1),(1,2),(2,2)],
-        [(0,1),(1,1),(2,1),(0,2)],
-        [(0,0),(1,0),(1,1),(1,2)],
-    ],
-    'S': [
-        [(1,0),(2,0),(0,1),(1,1)],
-        [(1,0),(1,1),(2,1),(2,2)],
-        [(1,1),(2,1),(0,2),(1,2)],
-        [(0,0),(0,1),(1,1),(1,2)],
-    ],
-    'Z': [
-        [(0,0),(1,0),(1,1),(2,1)],
-        [(2,0),(1,1),(2,1),(1,2)],
-        [(0,1),(1,1),(1,2),(2,2)],
-        [(1,0),(0,1),(1,1),(0,2)],
-    ]
-}
-
-def make_grid():
-    return [[None for _ in range(WIDTH)] for _ in range(HEIGHT)]
-
-def grid_to_strings(grid):
-    rows = []
-    for y in range(HEIGHT):
-        row = ''.join(grid[y][x] if grid[y][x] else '.' for x in range(WIDTH))
-        rows.append(row)
-    return rows
-
-def strings_to_grid(rows):
-    g = make_grid()
-    for y in range(min(HEIGHT, len(rows))):
-        for x in range(min(WIDTH, len(rows[y]))):
-            ch = rows[y][x]
-            g[y][x] = None if ch == '.' else ch
-    return g
-
-def hard_drop_position(grid, piece_name, rotation, x_offset):
-    cells = TETROMINOS[piece_name][rotation % 4]
-    # compute lowest y such that piece does not collide (spawn from top)
-    y = 0
-    # ensure in-bounds horizontally
-    min_x = min(x for x,y0 in cells)
-    max_x = max(x for x,y0 in cells)
-    if x_offset + min_x < 0 or x_offset + max_x >= WIDTH:
-        return None
-    while True:
-        collided = False
-        out = False
-        for (cx, cy) in cells:
-            xx = x_offset + cx
-            yy = y + cy
-            if yy >= HEIGHT:
-                out = True
-                break
-            if yy >= 0 and grid[yy][xx] is not None:
-                collided = True
-                break
-        if collided or out:
-            # step back
-            y -= 1
-            final_cells = [(x_offset + cx, y + cy) for (cx,cy) in cells]
-            # ensure final within bounds
-            for (fx,fy) in final_cells:
-                if fy < 0 or fy >= HEIGHT or fx < 0 or fx >= WIDTH:
-                    return None
-                if grid[fy][fx] is not None:
-                    return None
-            return final_cells
-        y += 1
-
-def lock_and_clear(grid, piece_name, cells) -> int:
-    for (x,y) in cells:
-        if y < 0:  # topped out
-            return -1
-        grid[y][x] = piece_name
-    # clear lines
-    cleared = 0
-    y = HEIGHT-1
-    while y >= 0:
-        if all(grid[y][x] is not None for x in range(WIDTH)):
-            # remove row
-            del grid[y]
-            grid.insert(0, [None]*WIDTH)
-            cleared += 1
-        else:
-            y -= 1
-    return cleared
+from typing import List, Dict, Optional
+import time, random
+from ctcore import (WIDTH, PIECE_META, PIECE_NAMES, COLUMN_PROBES, make_grid, make_rows,
+                    make_heights, grid_to_strings, hard_drop_position, lock_and_clear)
 
 @dataclass
 class Player:
     name: str
-    grid: List[List[Optional[str]]] = field(default_factory=make_grid)
+    grid: bytearray = field(default_factory=make_grid)            # piece letters, for grid_to_strings
+    rows: List[int] = field(default_factory=make_rows)            # occupancy, for collisions
+    col_heights: List[int] = field(default_factory=make_heights)  # stack height per column
     lines: int = 0
     tetris: int = 0
     tops: bool = False  # topped out
@@ -147,7 +34,7 @@ class DuelGame:
         self._build_queue()
 
     def _build_queue(self):
-        names = list(TETROMINOS.keys())
+        names = list(PIECE_NAMES)
         q = []
         while len(q) < self.piece_count:
             bag = names[:]
@@ -163,17 +50,16 @@ class DuelGame:
 
     def valid_columns(self, pid: str, rotation: int) -> List[int]:
         # based on current board
-        g = self.players[pid].grid
+        p = self.players[pid]
         piece = self.queue[self.piece_idx]
-        cols = []
-        # x can range such that piece fits
-        min_x = -min(x for x,y in TETROMINOS[piece][rotation%4])
-        max_x = WIDTH - 1 - max(x for x,y in TETROMINOS[piece][rotation%4])
-        for x in range(min_x, max_x+1):
-            cells = hard_drop_position(g, piece, rotation, x)
-            if cells is not None:
-                cols.append(x)
-        return cols
+        rotation %= 4
+        cols = COLUMN_PROBES[piece, rotation](p.col_heights)
+        if cols is not None:
+            return cols
+        # near the top the probe gives up, so search every x exactly
+        min_x, max_x, _, _, _ = PIECE_META[piece, rotation]
+        return [x for x in range(-min_x, WIDTH - max_x)
+                if hard_drop_position(p.rows, piece, rotation, x) is not None]
 
     def place(self, pid: str, rotation: int, x: int):
         if self.phase != 'PLAYING':
@@ -213,13 +99,13 @@ class DuelGame:
         # apply P1 then P2 (order doesn't matter since separate grids)
         for pid in ['P1','P2']:
             mv = self.pending[pid]
-            grid = self.players[pid].grid
-            cells = hard_drop_position(grid, piece, mv['rot'], mv['x'])
+            p = self.players[pid]
+            cells = hard_drop_position(p.rows, piece, mv['rot'], mv['x'])
             if cells is None:
                 # cannot place -> topped
                 self.players[pid].tops = True
             else:
-                cleared = lock_and_clear(grid, piece, cells)
+                cleared = lock_and_clear(p.grid, p.rows, p.col_heights, piece, cells)
                 if cleared < 0:
                     self.players[pid].tops = True
                 else:
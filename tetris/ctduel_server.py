@@ -3,7 +3,7 @@
 from flask import Flask, send_from_directory, request
 from flask_socketio import SocketIO, emit, join_room
 from ctduel_engine import DuelGame
-import time, os
+import os
 
 app = Flask(__name__, static_folder='.')
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
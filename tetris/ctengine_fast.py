@@ -0,0 +1,55 @@
+
+# ctengine_fast.py
+# Numba version of the valid_columns sweep; AVAILABLE is False without numba/numpy
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+AVAILABLE = njit is not None
+
+if AVAILABLE:
+    @njit(cache=True)
+    def _drop(rows, dys, masks, shift, max_dy, height):
+        # same search as hard_drop_position: landing y, or -2 if the piece doesn't fit
+        top = 0
+        while top < height and rows[top] == 0:
+            top += 1
+        land = height - max_dy
+        for i in range(dys.shape[0]):
+            dy = dys[i]
+            mask = masks[i] << shift
+            y = top - dy if top > dy else 0
+            if y < land:
+                while y < land and (rows[y + dy] & mask) == 0:
+                    y += 1
+                land = y
+        y = land - 1
+        if y < 0:
+            for i in range(dys.shape[0]):
+                if y + dys[i] < 0 or (rows[y + dys[i]] & (masks[i] << shift)) != 0:
+                    return -2
+        return y
+
+    @njit(cache=True)
+    def _valid_columns(rows, dys, masks, min_x, max_x, max_dy, width, height):
+        out = np.empty(width, dtype=np.int64)
+        n = 0
+        for x in range(-min_x, width - max_x):
+            if _drop(rows, dys, masks, x + min_x, max_dy, height) != -2:
+                out[n] = x
+                n += 1
+        return out[:n]
+
+def piece_table(piece_rows):
+    """(dys, masks) arrays for one PIECE_META rows tuple, built once per (piece, rotation)"""
+    return (np.array([dy for dy, _ in piece_rows], dtype=np.int64),
+            np.array([mask for _, mask in piece_rows], dtype=np.int64))
+
+def valid_columns(rows, table, min_x, max_x, max_dy, width, height):
+    """Every x where the piece can be hard dropped onto the occupancy rows"""
+    dys, masks = table
+    return _valid_columns(np.array(rows, dtype=np.int64), dys, masks,
+                          min_x, max_x, max_dy, width, height).tolist()
@@ -1,163 +1,112 @@
 
 # ctshared_engine.py
 from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Optional
+from typing import List, Dict, Optional
 import time, random
+import ctengine_fast
+from ctcore import (WIDTH, HEIGHT, PIECE_NAMES, PIECE_META, FAST_ROWS, COLUMN_PROBES,
+                    make_grid, make_rows, make_heights, grid_to_strings,
+                    hard_drop_position, lock_and_clear)
 
-WIDTH, HEIGHT = 10, 20
-
-TETROMINOS = {
-    'I': [
-        [(0,1),(1,1),(2,1),(3,1)],
-        [(2,0),(2,1),(2,2),(2,3)],
-        [(0,2),(1,2),(2,2),(3,2)],
-        [(1,0),(1,1),(1,2),(1,3)],
-    ],
-    'O': [
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(2,1)],
-    ],
-    'T': [
-        [(1,0),(0,1),(1,1),(2,1)],
-        [(1,0),(1,1),(2,1),(1,2)],
-        [(0,1),(1,1),(2,1),(1,2)],
-        [(1,0),(0,1),(1,1),(1,2)],
-    ],
-    'J': [
-        [(0,0),(0,1),(1,1),(2,1)],
-        [(1,0),(2,0),(1,1),(1,2)],
-        [(0,1),(1,1),(2,1),(2,2)],
-        [(1,0),(1,1),(0,2),(1,2)],
-    ],
-    'L': [
-        [(2,0),(0,1),(1,1),(2,1)],
-        [(1,0),(1,1),(1,2),(2,2)],
-        [(0,1),(1,1),(2,1),(0,2)],
-        [(0,0),(1,0),(1,1),(1,2)],
-    ],
-    'S': [
-        [(1,0),(2,0),(0,1),(1,1)],
-        [(1,0),(1,1),(2,1),(2,2)],
-        [(1,1),(2,1),(0,2),(1,2)],
-        [(0,0),(0,1),(1,1),(1,2)],
-    ],
-    'Z': [
-        [(0,0),(1,0),(1,1),(2,1)],
-        [(2,0),(1,1),(2,1),(1,2)],
-        [(0,1),(1,1),(1,2),(2,2)],
-        [(1,0),(0,1),(1,1),(0,2)],
-    ]
-}
-
-def make_grid():
-    return [[None for _ in range(WIDTH)] for _ in range(HEIGHT)]
-
-def grid_to_strings(grid: List[List[Optional[str]]]) -> List[str]:
-    return [''.join(c if c else '.' for c in row) for row in grid]
-
-def hard_drop_position(grid, piece_name, rotation, x_offset):
-    cells = TETROMINOS[piece_name][rotation % 4]
-    # horizontal bounds check
-    min_x = min(x for x,_ in cells)
-    max_x = max(x for x,_ in cells)
-    if x_offset + min_x < 0 or x_offset + max_x >= WIDTH:
-        return None
-    y = 0
-    while True:
-        collided = False
-        out = False
-        for (cx, cy) in cells:
-            xx = x_offset + cx
-            yy = y + cy
-            if yy >= HEIGHT:
-                out = True
-                break
-            if yy >= 0 and grid[yy][xx] is not None:
-                collided = True
-                break
-        if collided or out:
-            y -= 1
-            final = [(x_offset + cx, y + cy) for (cx,cy) in cells]
-            # validate
-            for (fx,fy) in final:
-                if fy < 0 or fy >= HEIGHT or fx < 0 or fx >= WIDTH:
-                    return None
-                if grid[fy][fx] is not None:
-                    return None
-            return final
-        y += 1
-
-def lock_and_clear(grid, piece_name, cells) -> int:
-    for (x,y) in cells:
-        if y < 0:
-            return -1  # topped
-        grid[y][x] = piece_name
-    # clear lines
-    cleared = 0
-    y = HEIGHT-1
-    while y >= 0:
-        if all(grid[y][x] is not None for x in range(WIDTH)):
-            del grid[y]
-            grid.insert(0, [None]*WIDTH)
-            cleared += 1
-        else:
-            y -= 1
-    return cleared
+MOVE_SECONDS = 20.0  # time limit per move
+
+_PSTATE_VIEW_FIELDS = frozenset(('name', 'lines', 'tetris', 'tops'))
 
-@dataclass
+@dataclass(slots=True)
 class PState:
+    # declared first so it exists before __init__ assigns the fields below
+    view: Dict = field(init=False, repr=False, compare=False, default_factory=dict)  # the snapshot's entry for this player
     name: str = 'P'
     lines: int = 0
     tetris: int = 0
     tops: bool = False
 
-@dataclass
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key in _PSTATE_VIEW_FIELDS:
+            self.view[key] = value
+
+@dataclass(slots=True)
 class SharedGame:
     room: str
     ante: int = 10
     seed: int = 42
     piece_count: int = 20
     phase: str = 'LOBBY'          # LOBBY -> PLAYING -> SHOWDOWN
-    grid: List[List[Optional[str]]] = field(default_factory=make_grid)
+    grid: bytearray = field(default_factory=make_grid)                   # piece letters, for grid_to_strings
+    rows: List[int] = field(default_factory=make_rows)                   # occupancy, for collisions
+    col_heights: List[int] = field(default_factory=make_heights)         # stack height per column
     players: Dict[str, PState] = field(default_factory=lambda: {'P1': PState('P1'), 'P2': PState('P2')})
     queue: List[str] = field(default_factory=list)
     piece_idx: int = 0
     turn: str = 'P1'              # whose turn it is
-    deadline_ts: float = 0.0      # time limit per move
+    deadline_ts: float = 0.0      # time limit per move, wall clock for the clients' countdown
+    deadline: float = 0.0         # the same limit on time.monotonic(), which tick() checks
+    rng: random.Random = field(init=False, repr=False)
+    _valid_cache: Dict[int, List[int]] = field(init=False, repr=False, default_factory=dict)  # rotation -> valid_columns for the current piece
+    _grid_strings: Optional[List[str]] = field(init=False, repr=False, default=None)         # grid_to_strings(grid), until the next lock
+    dirty: bool = field(init=False, repr=False, default=True)   # state changed since the last broadcast; the server clears it
+    _snapshot_base: Dict = field(init=False, repr=False)         # snapshot fields fixed at creation
+    _player_views: Dict = field(init=False, repr=False)          # pid -> PState.view, kept current by PState
 
     def __post_init__(self):
         self.rng = random.Random(self.seed)
         self._build_queue()
+        self._snapshot_base = {'queue_len': len(self.queue), 'ante': self.ante, 'pot': self.ante*2}
+        self._player_views = {pid: p.view for pid, p in self.players.items()}
 
     def _build_queue(self):
-        names = list(TETROMINOS.keys())
+        # 7-bag randomizer; every bag is shuffled from the same order, so a seed always gives the same queue
         q = []
-        while len(q) < self.piece_count:
-            bag = names[:]
+        for _ in range(-(-self.piece_count // len(PIECE_NAMES))):
+            bag = list(PIECE_NAMES)
             self.rng.shuffle(bag)
-            q.extend(bag)
-        self.queue = q[:self.piece_count]
+            q += bag
+        del q[self.piece_count:]
+        self.queue = q
 
     def start(self):
         self.phase = 'PLAYING'
         self.piece_idx = 0
+        self._valid_cache.clear()
         self.turn = 'P1' if self.rng.random() < 0.5 else 'P2'
-        self.deadline_ts = time.time() + 20.0
+        self._set_deadline()
+        self.dirty = True
 
     def valid_columns(self, rotation: int) -> List[int]:
         if self.phase != 'PLAYING': return []
         if self.piece_idx >= len(self.queue): return []
+        rotation %= 4
+        # the grid only changes when a piece is resolved, which clears the cache
+        cols = self._valid_cache.get(rotation)
+        if cols is not None:
+            return cols
         piece = self.queue[self.piece_idx]
-        cells = TETROMINOS[piece][rotation % 4]
-        min_x = -min(x for x,_ in cells)
-        max_x = WIDTH - 1 - max(x for x,_ in cells)
-        cols = []
-        for x in range(min_x, max_x+1):
-            pos = hard_drop_position(self.grid, piece, rotation, x)
-            if pos is not None:
-                cols.append(x)
+        cols = COLUMN_PROBES[piece, rotation](self.col_heights)
+        if cols is not None:
+            self._valid_cache[rotation] = cols
+            return cols
+        # near the top the probe gives up, so search every x exactly
+        min_x, max_x, _, max_dy, floors = PIECE_META[piece, rotation]
+        if FAST_ROWS is not None:
+            cols = ctengine_fast.valid_columns(self.rows, FAST_ROWS[piece, rotation],
+                                               min_x, max_x, max_dy, WIDTH, HEIGHT)
+        else:
+            cols = []
+            heights = self.col_heights
+            for shift in range(WIDTH - max_x + min_x):
+                # first y where the piece would hit the stack, from the column heights alone
+                land = HEIGHT
+                for dx, floor in floors:
+                    y = floor - heights[shift + dx]
+                    if y < land:
+                        land = y
+                if land > 0:
+                    cols.append(shift - min_x)
+                elif hard_drop_position(self.rows, piece, rotation, shift - min_x) is not None:
+                    # the stack reaches the rows the piece starts in, where holes matter
+                    cols.append(shift - min_x)
+        self._valid_cache[rotation] = cols
         return cols
 
     def _auto_choice(self) -> Dict[str,int]:
@@ -179,13 +128,14 @@ class SharedGame:
         if x not in valid:
             return False, 'Ogiltig kolumn för den rotationen.'
         piece = self.queue[self.piece_idx]
-        cells = hard_drop_position(self.grid, piece, rotation, x)
+        cells = hard_drop_position(self.rows, piece, rotation, x)
         if cells is None:
             # treat as top out
             self.players[pid].tops = True
             self._advance_turn(end_after=True)
             return True, 'Top-out.'
-        cleared = lock_and_clear(self.grid, piece, cells)
+        cleared = lock_and_clear(self.grid, self.rows, self.col_heights, piece, cells)
+        self._grid_strings = None
         if cleared < 0:
             self.players[pid].tops = True
         else:
@@ -197,17 +147,24 @@ class SharedGame:
 
     def _advance_turn(self, end_after: bool=False):
         self.piece_idx += 1
+        self._valid_cache.clear()
+        self.dirty = True
         if end_after or self.piece_idx >= len(self.queue) or any(p.tops for p in self.players.values()):
             self.phase = 'SHOWDOWN'
             return
         # switch player and set deadline
         self.turn = 'P1' if self.turn == 'P2' else 'P2'
-        self.deadline_ts = time.time() + 20.0
+        self._set_deadline()
+
+    def _set_deadline(self):
+        self.deadline = time.monotonic() + MOVE_SECONDS
+        self.deadline_ts = time.time() + MOVE_SECONDS
 
-    def tick(self):
+    def tick(self, now: Optional[float] = None):
+        # now is a time.monotonic() reading; the server passes one per loop iteration
         if self.phase != 'PLAYING':
             return
-        if time.time() > self.deadline_ts:
+        if (time.monotonic() if now is None else now) > self.deadline:
             # auto place for current player
             choice = self._auto_choice()
             self.place(self.turn, choice['rot'], choice['x'])
@@ -229,23 +186,22 @@ class SharedGame:
             return {'winner':'P1','payout':{'P1':pot,'P2':0}}
         return {'winner':None,'payout':{'P1':pot//2,'P2':pot - pot//2}}
 
+    def grid_strings(self) -> List[str]:
+        if self._grid_strings is None:
+            self._grid_strings = grid_to_strings(self.grid)
+        return self._grid_strings
+
     def snapshot(self):
-        s = {
-            'phase': self.phase,
-            'turn': self.turn,
-            'queue_len': len(self.queue),
-            'piece_idx': self.piece_idx,
-            'current_piece': self.queue[self.piece_idx] if self.phase=='PLAYING' and self.piece_idx < len(self.queue) else None,
-            'next_piece': self.queue[self.piece_idx+1] if self.phase=='PLAYING' and self.piece_idx+1 < len(self.queue) else None,
-            'ante': self.ante,
-            'pot': self.ante*2,
-            'deadline_ts': self.deadline_ts,
-            'grid': grid_to_strings(self.grid),
-            'players': {
-                pid: {'name': p.name, 'lines': p.lines, 'tetris': p.tetris, 'tops': p.tops}
-                for pid,p in self.players.items()
-            }
-        }
+        s = self._snapshot_base.copy()
+        s['phase'] = self.phase
+        s['turn'] = self.turn
+        s['piece_idx'] = self.piece_idx
+        s['current_piece'] = self.queue[self.piece_idx] if self.phase=='PLAYING' and self.piece_idx < len(self.queue) else None
+        s['next_piece'] = self.queue[self.piece_idx+1] if self.phase=='PLAYING' and self.piece_idx+1 < len(self.queue) else None
+        s['deadline_ts'] = self.deadline_ts
+        s['grid'] = self.grid_strings()
+        # live views: they track the players, so callers must not modify them
+        s['players'] = self._player_views
         if self.phase == 'SHOWDOWN':
             s['result'] = self.result()
         return s
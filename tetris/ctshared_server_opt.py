@@ -3,7 +3,8 @@
 from flask import Flask, send_from_directory, request
 from flask_socketio import SocketIO, emit, join_room
 from ctshared_engine import SharedGame
-import os
+import fast_json
+import os, time
 
 app = Flask(__name__, static_folder='.')
 # try to use eventlet (better WS); fallback to threading
@@ -14,11 +15,13 @@ try:
 except Exception:
     pass
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode, ping_interval=25, ping_timeout=60)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode, ping_interval=25, ping_timeout=60, json=fast_json)
 
 GAMES = {}  # room -> SharedGame
 SESS = {}   # sid -> (room, pid)
-BG = {}     # room -> bg-task
+ROOM_OCC = {}  # room -> pids with a connected session, kept in step with SESS
+BG = None   # the one bg-task ticking every room, started with the first game
+LAST_SNAPSHOT = {}  # room -> last snapshot sent, reused until the game is dirty again
 
 @app.route('/')
 def root():
@@ -28,20 +31,43 @@ def root():
 def health():
     return 'ok', 200
 
-def broadcast(room):
-    if room in GAMES:
-        socketio.emit('state', GAMES[room].snapshot(), to=room)
+def set_session(sid, room, pid):
+    prev = SESS.get(sid)
+    if prev:
+        ROOM_OCC[prev[0]].discard(prev[1])
+    SESS[sid] = (room, pid)
+    ROOM_OCC.setdefault(room, set()).add(pid)
 
-def ensure_bg(room):
-    if room in BG:
+def broadcast(room):
+    g = GAMES.get(room)
+    if g is None:
         return
-    def loop():
-        while room in GAMES and GAMES[room].phase == 'PLAYING':
-            GAMES[room].tick()
-            broadcast(room)
-            socketio.sleep(0.2)  # 5 Hz
-        BG.pop(room, None)
-    BG[room] = socketio.start_background_task(loop)
+    snap = LAST_SNAPSHOT.get(room)
+    if snap is None or g.dirty:
+        snap = LAST_SNAPSHOT[room] = g.snapshot()
+        g.dirty = False
+    socketio.emit('state', snap, to=room)
+
+def bg_loop():
+    while True:
+        now = time.monotonic()
+        for room, g in list(GAMES.items()):
+            if g.phase != 'PLAYING':
+                continue
+            try:
+                g.tick(now)
+                # clients run the countdown from deadline_ts themselves, so idle ticks send nothing
+                if g.dirty:
+                    broadcast(room)
+            except Exception:
+                # one broken room must not stop the clock for the others
+                app.logger.exception('tick failed for room %s', room)
+        socketio.sleep(0.2)  # 5 Hz
+
+def ensure_bg():
+    global BG
+    if BG is None:
+        BG = socketio.start_background_task(bg_loop)
 
 @socketio.on('create_room')
 def create_room(data):
@@ -56,7 +82,7 @@ def create_room(data):
     g.players['P1'].name = name
     GAMES[room] = g
     join_room(room)
-    SESS[request.sid] = (room,'P1')
+    set_session(request.sid, room, 'P1')
     emit('joined', {'room': room, 'as':'P1', 'async_mode': async_mode})
     broadcast(room)
 
@@ -65,12 +91,13 @@ def join_room_evt(data):
     room = data.get('room','lobby')
     if room not in GAMES:
         emit('error', {'message':'Finns inget sådant rum.'}); return
-    if any(val==(room,'P2') for val in SESS.values()):
+    if 'P2' in ROOM_OCC.get(room, ()):
         emit('error', {'message':'Rummet är fullt.'}); return
     name = data.get('name','P2')
     join_room(room)
-    SESS[request.sid] = (room,'P2')
+    set_session(request.sid, room, 'P2')
     GAMES[room].players['P2'].name = name
+    GAMES[room].dirty = True
     emit('joined', {'room': room, 'as':'P2', 'async_mode': async_mode})
     broadcast(room)
 
@@ -83,10 +110,10 @@ def start_evt(data):
     g = GAMES[room]
     if g.phase != 'LOBBY':
         emit('error', {'message':'Spelet har redan startat.'}); return
-    if not any(v==(room,'P2') for v in SESS.values()):
+    if 'P2' not in ROOM_OCC.get(room, ()):
         emit('error', {'message':'Väntar på motståndare.'}); return
     g.start()
-    ensure_bg(room)
+    ensure_bg()
     broadcast(room)
 
 @socketio.on('valid')
@@ -117,6 +144,7 @@ def place_evt(data):
 def disc():
     if request.sid in SESS:
         room, pid = SESS.pop(request.sid)
+        ROOM_OCC[room].discard(pid)
         socketio.emit('info', {'message': f'{pid} kopplade från.'}, to=room)
 
 if __name__ == '__main__':
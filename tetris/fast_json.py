@@ -0,0 +1,19 @@
+
+# fast_json.py
+# JSON codec for Socket.IO: orjson when it is installed, else the stdlib json module
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj, **kwargs):
+        # orjson output is always compact, so separators and friends are ignored
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+else:
+    dumps = json.dumps
+    loads = json.loads